@@ -0,0 +1,134 @@
+"""Persistent key/value cache backed by SQLite.
+
+Entries are evicted once they are older than ``max_age`` seconds and, least
+recently used first, whenever the stored values exceed ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = os.getenv("CERTCREATE_CACHE_DIR", "cache")
+
+
+class PersistentCache:
+    """Content-addressed string cache shared across reruns and processes."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 30 * 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Return a stable SHA-256 digest for the given JSON-serializable parts."""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not be shared with forked worker processes.
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for ``key`` or ``None`` on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            if now - created > self.max_age:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` and evict stale or excess entries."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "DELETE FROM entries WHERE created < ?", (now - self.max_age,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
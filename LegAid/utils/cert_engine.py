@@ -0,0 +1,1456 @@
+"""Certificate engine shared by CertCreate and the batch CLI.
+
+Everything here runs without a Streamlit session so it can be imported by
+``cert_batch.py`` and by worker processes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from copy import deepcopy
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import openai
+import pandas as pd
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt
+from pdfminer.high_level import extract_text
+from PIL import Image
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from striprtf.striprtf import rtf_to_text
+import fitz  # PyMuPDF
+
+from .cache import DEFAULT_CACHE_DIR, PersistentCache
+from .cert_log_store import get_log_store
+from .dates import EVENT_DATE_PATTERNS, parse_date
+from .json_stream import CertificateStreamParser
+from .log_writer import batch_id, get_log_writer
+from .pdf_layout import fit_font_size, wrap_text
+from .ocr import OCR_MAX_WORKERS, normalize_image, vision_ocr_image
+from .shared_functions import (
+    normalize_date_strings,
+    enforce_first_person,
+    enforce_first_person_many,
+    extract_json_block,
+)
+
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Font and text constraints
+NAME_MIN_SIZE = 24
+NAME_MAX_SIZE = 60
+NAME_MAX_LINES = 1
+NAME_MAX_CHARS = 35
+
+TITLE_MIN_SIZE = 22
+TITLE_MAX_SIZE = 28
+TITLE_MAX_LINES = 1
+TITLE_MAX_CHARS = 40
+
+TEXT_MIN_SIZE = 14
+TEXT_MAX_SIZE = 20
+TEXT_MAX_LINES = 5
+TEXT_MAX_CHARS = 335
+
+# Width of the name, title and text boxes: a letter page less 0.75" margins
+CERT_BOX_WIDTH = letter[0] - 1.5 * inch
+
+SUPPORTED_EXTENSIONS = {
+    ".pdf",
+    ".docx",
+    ".doc",
+    ".txt",
+    ".csv",
+    ".xlsx",
+    ".xls",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".tif",
+    ".tiff",
+    ".bmp",
+    ".gif",
+    ".rtf",
+}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif"}
+
+# Resolution used when rasterizing image-only PDF pages for OCR
+OCR_DPI = 200
+
+# Certificates per worker when rendering large PDFs in parallel
+PDF_SHARD_SIZE = 100
+
+# Upper bound on concurrent LLM calls when regenerating a batch
+REGEN_MAX_WORKERS = 8
+
+# Request texts longer than this are extracted in chunks of at most this size
+EXTRACT_CHUNK_CHARS = 6000
+# Upper bound on concurrent LLM calls when extracting a chunked request
+EXTRACT_MAX_WORKERS = 4
+# A short opening paragraph (the event description) is repeated in each chunk
+EXTRACT_HEADER_CHARS = 600
+# Chunks whose reply is still truncated are halved until they reach this size
+EXTRACT_MIN_CHUNK_CHARS = 500
+
+# Document structure tried in order when splitting a long request: page
+# breaks, blank lines, line breaks, then sentence ends.
+_SPLIT_PATTERNS = tuple(
+    re.compile(pattern) for pattern in (r"\f+", r"\n\s*\n", r"\n", r"(?<=[.!?;])\s+")
+)
+
+FLYER_PREFIX = (
+    "This is the text from an event flyer. Use layout and wording to infer participants and purpose.\n"
+)
+
+_client = None
+
+# Temperature-0 replies are reused across reruns, refreshes and staff members.
+llm_cache = PersistentCache(os.path.join(DEFAULT_CACHE_DIR, "llm_responses.sqlite3"))
+
+
+def get_client():
+    """Return a process-wide OpenAI client, created on first use."""
+    global _client
+    if _client is None:
+        _client = openai.OpenAI()
+    return _client
+
+
+def _complete_json(client, system, user_msg, cache_key=None, on_item=None):
+    """Return the parsed JSON reply to a temperature-0 chat completion.
+
+    Replies are cached in ``llm_cache`` under ``cache_key``, which defaults to
+    a hash of the model and both messages. Only replies that parse are stored.
+
+    With ``on_item`` the completion is streamed, and ``on_item(item, fields)``
+    is called for each certificate object as soon as it is complete; see
+    :class:`CertificateStreamParser`. Cached replies are not replayed.
+
+    ``system`` may be a callable returning the prompt, which is only called
+    when the reply is not cached; ``cache_key`` is then required.
+
+    A reply cut off at ``max_tokens`` raises :class:`json.JSONDecodeError` and
+    is not cached, even when a complete object could be salvaged from it.
+    """
+    key = cache_key or PersistentCache.make_key(OPENAI_MODEL, system, user_msg)
+    content = llm_cache.get(key)
+    cached = content is not None
+    if not cached:
+        if callable(system):
+            system = system()
+        request = dict(
+            model=OPENAI_MODEL,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": user_msg}],
+            temperature=0,
+            max_tokens=2000,
+        )
+        if on_item is None:
+            response = client.chat.completions.create(**request)
+            content = response.choices[0].message.content
+            finish_reason = getattr(response.choices[0], "finish_reason", None)
+        else:
+            parser = CertificateStreamParser()
+            finish_reason = None
+            for chunk in client.chat.completions.create(stream=True, **request):
+                if not chunk.choices:
+                    continue
+                finish_reason = getattr(chunk.choices[0], "finish_reason", None) or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    for item in parser.feed(delta):
+                        on_item(item, parser.fields)
+            content = parser.text
+        if finish_reason == "length":
+            raise json.JSONDecodeError("JSON content appears to be truncated in the response.", content, len(content))
+    try:
+        cleaned = extract_json_block(content)
+    except ValueError as exc:
+        raise json.JSONDecodeError(str(exc), content, 0) from exc
+    data = json.loads(cleaned)
+    if not cached:
+        llm_cache.set(key, content)
+    return data
+
+
+def _assume_year(dt: datetime, missing_year: bool) -> datetime:
+    """Return dt with assumed year if missing."""
+    if not missing_year:
+        return dt
+
+    today = datetime.today()
+    dt = dt.replace(year=today.year)
+    if (dt.month, dt.day) < (today.month, today.day):
+        dt = dt.replace(year=today.year + 1)
+    return dt
+
+
+def format_certificate_date(raw_date_str):
+    dt = parse_date(raw_date_str, datetime.today().year)
+    if dt is not None:
+        missing_year = dt.year == 1900
+        dt = _assume_year(dt, missing_year)
+    else:
+        for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+            try:
+                dt = datetime.strptime(raw_date_str, fmt)
+                missing_year = False
+                break
+            except ValueError:
+                continue
+        else:
+            return "Dated ______"
+    day = dt.day
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    month = dt.strftime("%B")
+    year_map = {
+        2023: "Two Thousand and Twenty-Three",
+        2024: "Two Thousand and Twenty-Four",
+        2025: "Two Thousand and Twenty-Five",
+        2026: "Two Thousand and Twenty-Six",
+        2027: "Two Thousand and Twenty-Seven",
+        2028: "Two Thousand and Twenty-Eight",
+        2029: "Two Thousand and Twenty-Nine",
+        2030: "Two Thousand and Thirty",
+    }
+    year_words = year_map.get(dt.year, dt.strftime("%Y"))
+    return f"Dated the {day}{suffix} of {month}\n{year_words}"
+
+
+def extract_event_date(text):
+    """Attempt to parse a date from freeform text."""
+    return _extract_event_date(text, datetime.today().year)
+
+
+@lru_cache(maxsize=32)
+def _extract_event_date(text, default_year):
+    # Memoized because the page re-extracts from the same request text on
+    # every rerun.
+    for pattern in EVENT_DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            dt = parse_date(match.group(0), default_year)
+            if dt is None:
+                continue
+            missing_year = dt.year == 1900
+            dt = _assume_year(dt, missing_year)
+            return dt.strftime("%B %d, %Y")
+    return None
+
+
+def determine_name_font_size(name: str) -> int:
+    """Return the largest name size, up to NAME_MAX_SIZE, that fits the name box.
+
+    Widths are measured with the Times-Bold metrics the PDF is drawn with;
+    Word's Times New Roman has the same metrics. Names too wide even at
+    NAME_MIN_SIZE get NAME_MIN_SIZE.
+    """
+    return fit_font_size(
+        name, "Times-Bold", CERT_BOX_WIDTH, NAME_MIN_SIZE, NAME_MAX_SIZE, NAME_MAX_LINES
+    )
+
+
+def determine_title_font_size(title: str) -> int:
+    """Return the largest title size that fits the title box, or 0 without a title."""
+    if not title.strip():
+        return 0
+    return fit_font_size(
+        title, "Times-Bold", CERT_BOX_WIDTH, TITLE_MIN_SIZE, TITLE_MAX_SIZE, TITLE_MAX_LINES
+    )
+
+
+def determine_text_font_size(text: str) -> int:
+    """Return the largest commendation size that fits TEXT_MAX_LINES lines."""
+    return fit_font_size(
+        text, "Times-Roman", CERT_BOX_WIDTH, TEXT_MIN_SIZE, TEXT_MAX_SIZE, TEXT_MAX_LINES
+    )
+
+
+def format_display_title(title: str, org: str) -> str:
+    """Return either the title or organization depending on context."""
+    title_clean = title.strip()
+    org_clean = org.strip()
+
+    generic_titles = {"organization", "committee", "organisation"}
+
+    if not title_clean or title_clean.lower() in generic_titles or title_clean.lower() == org_clean.lower():
+        return org_clean
+
+    return title_clean or org_clean
+
+
+def normalize_spacing(text: str) -> str:
+    """Return text with excess whitespace removed."""
+    cleaned = re.sub(r"\s+", " ", text)
+    cleaned = cleaned.replace(" ,", ",").replace(" .", ".")
+    return cleaned.strip()
+
+
+# Commendation tones in priority order with the keywords that select them in
+# the event context and in the certificate category.
+TONE_KEYWORDS = (
+    ("solemn", ("memorial", "tribute", "in memory"), ("memorial", "tribute")),
+    ("patriotic", ("veteran", "patriotic", "flag", "military"), ("veteran", "military")),
+    (
+        "celebratory",
+        ("celebration", "festival", "anniversary", "award", "gala", "recognition"),
+        ("celebration", "anniversary", "award", "opening", "congratulation", "festival"),
+    ),
+)
+
+
+def _tone_pattern(index: int) -> tuple[re.Pattern, dict[str, str]]:
+    styles = {word: style for style, *words in TONE_KEYWORDS for word in words[index]}
+    # A lookahead reports overlapping keywords, matching independent substring tests.
+    alternation = "|".join(re.escape(word) for word in sorted(styles, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), styles
+
+
+_CONTEXT_TONES = _tone_pattern(0)
+_CATEGORY_TONES = _tone_pattern(1)
+_TONE_PRIORITY = tuple(style for style, *_ in TONE_KEYWORDS)
+
+
+def _tones(text: str, tones) -> frozenset[str]:
+    pattern, styles = tones
+    found = set()
+    for match in pattern.finditer(text.lower()):
+        found.add(styles[match.group(1)])
+        if _TONE_PRIORITY[0] in found:
+            break  # nothing outranks the first tone
+    return frozenset(found)
+
+
+@lru_cache(maxsize=32)
+def context_tones(context: str) -> frozenset[str]:
+    """Return the commendation tones whose keywords appear in ``context``.
+
+    The event context is shared by every certificate of a request, so it is
+    scanned once with a single compiled pattern and the result memoized.
+    """
+    return _tones(context, _CONTEXT_TONES)
+
+
+@lru_cache(maxsize=1024)
+def category_tones(category: str) -> frozenset[str]:
+    """Return the commendation tones whose keywords appear in ``category``."""
+    return _tones(category, _CATEGORY_TONES)
+
+
+def commendation_style(category: str = "", context: str = "") -> str:
+    """Return the commendation tone for a certificate, ``"formal"`` by default."""
+    found = context_tones(context) | category_tones(category)
+    return next((style for style in _TONE_PRIORITY if style in found), "formal")
+
+
+def enhanced_commendation(
+    name: str, title: str, org: str, category: str = "", context: str = ""
+) -> str:
+    """Return a concise commendation around the ``TEXT_MAX_CHARS`` length.
+
+    The opening phrase after ``On behalf of the California State Legislature``
+    varies based on the event ``context`` or provided ``category`` so it can
+    say "congratulations on", "honoring", "celebrating", etc.
+    """
+
+    style = commendation_style(category, context)
+
+    if style == "solemn":
+        opening = "On behalf of the California State Legislature, honoring"
+        closing = "I remember your lasting impact and offer my deepest respect."
+    elif style == "patriotic":
+        opening = "On behalf of the California State Legislature, I proudly commend"
+        closing = "Your devotion to our nation inspires all Californians."
+    elif style == "celebratory":
+        opening = "On behalf of the California State Legislature, congratulations on"
+        closing = "May this celebration bring continued success and joy."
+    else:
+        opening = "On behalf of the California State Legislature, recognizing"
+        closing = "Your steadfast commitment sets a standard for others."
+
+    parts = [opening]
+    if title and org:
+        parts.append(f"your exemplary service as {title} with {org}.")
+    elif title:
+        parts.append(f"your exemplary service as {title}.")
+    elif org:
+        parts.append(f"your exemplary service with {org}.")
+    else:
+        parts.append("your exemplary service.")
+
+    parts.append(closing)
+    text = " ".join(parts)
+    text = enforce_first_person(text)
+    if len(text) > TEXT_MAX_CHARS:
+        text = text[:TEXT_MAX_CHARS]
+    return text
+
+
+def certificate_preview_html(
+    name: str,
+    title: str,
+    org: str,
+    text: str,
+    date: str = "",
+    highlight: set | None = None,
+) -> str:
+    """Return HTML preview for a certificate.
+
+    Previews are memoized on their content, so redrawing an unchanged
+    certificate on a rerun is a cache lookup.
+    """
+    return _certificate_preview_html(name, title, org, text, date, frozenset(highlight or ()))
+
+
+@lru_cache(maxsize=1024)
+def _certificate_preview_html(name, title, org, text, date, highlight):
+    name_size = determine_name_font_size(name)
+    display_title = format_display_title(title, org)
+    title_size = determine_title_font_size(display_title)
+    text_size = determine_text_font_size(text)
+
+    name_html = name
+    if "name" in highlight:
+        name_html = f"<span style='color:red'>{name}</span>"
+    display_title_html = display_title
+    if {"title", "organization"} & highlight and display_title.strip():
+        display_title_html = f"<span style='color:red'>{display_title}</span>"
+    text_html = text.replace(chr(10), "<br>")
+    if "certificate_text" in highlight:
+        text_html = f"<span style='color:red'>{text_html}</span>"
+
+    lines = [
+        f"<div style='text-align:center; font-size:{int(name_size)}px; font-weight:bold; margin-bottom:4px;'>{name_html}</div>"
+    ]
+    if display_title.strip():
+        lines.append(
+            f"<div style='text-align:center; font-size:{int(title_size)}px; font-weight:bold; margin-bottom:4px;'>{display_title_html}</div>"
+        )
+    lines.append(
+        f"<div style='text-align:center; font-size:{int(text_size)}px; margin-top:8px;'>{text_html}</div>"
+    )
+    if date:
+        for idx, line in enumerate(date.split("\n")):
+            mt = 20 if idx == 0 else 0
+            lines.append(
+                f"<div style='text-align:center; font-size:12px; margin-top:{mt}px;'>{line}</div>"
+            )
+    lines.extend(
+        [
+            "<div style='text-align:right; font-size:12px; margin-top:0;'>_____________________________________</div>",
+            "<div style='text-align:right; font-size:14px; margin-top:0;'>Stan Ellis</div>",
+            "<div style='text-align:right; font-size:14px; margin-top:0;'>Assemblyman, 32nd District</div>",
+        ]
+    )
+    return "<br>".join(lines)
+
+
+def extract_pdf_text(data, ocr_key: str | None = None, ocr_workers: int = OCR_MAX_WORKERS) -> str:
+    """Return the text of an in-memory PDF, OCR-ing only pages without a text layer.
+
+    A single PyMuPDF pass keeps the native text of text-bearing pages and
+    rasterizes pages that only contain images. Those pages are sent to Vision
+    from a pool of ``ocr_workers`` threads while the pass continues, and the
+    results are stitched back in page order. Blank pages are skipped.
+    """
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        texts = [""] * doc.page_count
+        with ThreadPoolExecutor(max_workers=max(1, ocr_workers)) as pool:
+            pending = {}
+            for page in doc:
+                page_text = page.get_text()
+                if page_text.strip():
+                    texts[page.number] = page_text
+                elif ocr_key and page.get_image_info():
+                    png = page.get_pixmap(dpi=OCR_DPI).tobytes("png")
+                    pending[page.number] = pool.submit(vision_ocr_image, png, ocr_key)
+            for number, future in pending.items():
+                texts[number] = future.result()
+    return "\n".join(texts)
+
+
+def read_bytes(data, filename: str, ocr_key: str | None = None, ocr_workers: int = OCR_MAX_WORKERS):
+    """Return extracted text and source type for an in-memory upload.
+
+    ``data`` may be ``bytes`` or a ``memoryview``; every supported format is
+    parsed from memory so nothing is written to disk.
+    """
+    suffix = Path(filename).suffix.lower()
+    data = bytes(data) if isinstance(data, memoryview) else data
+
+    text = ""
+    if suffix == ".pdf":
+        try:
+            text = extract_pdf_text(data, ocr_key, ocr_workers)
+        except Exception:
+            try:
+                text = extract_text(BytesIO(data))
+            except Exception:
+                text = ""
+    elif suffix in {".txt", ".csv"}:
+        text = data.decode("utf-8", errors="ignore")
+    elif suffix in {".docx", ".doc"}:
+        try:
+            import docx2txt
+            text = docx2txt.process(BytesIO(data))
+        except Exception:
+            try:
+                doc = Document(BytesIO(data))
+                text = "\n".join(p.text for p in doc.paragraphs)
+            except Exception:
+                text = ""
+    elif suffix in {".rtf"}:
+        try:
+            text = rtf_to_text(data.decode("utf-8", errors="ignore"))
+        except Exception:
+            text = ""
+    elif suffix in {".xlsx", ".xls"}:
+        df = pd.read_excel(BytesIO(data), header=None)
+        lines = []
+        for row in df.astype(str).values:
+            line = " ".join(cell for cell in row if cell and cell != "nan")
+            if line:
+                lines.append(line)
+        text = "\n".join(lines)
+    elif suffix in IMAGE_EXTENSIONS:
+        try:
+            text = vision_ocr_image(normalize_image(Image.open(BytesIO(data))), ocr_key)
+            text = f"{FLYER_PREFIX}{text}"
+        except Exception:
+            text = ""
+    return text, suffix.lstrip(".")
+
+
+def read_document(path, ocr_key: str | None = None, ocr_workers: int = OCR_MAX_WORKERS):
+    """Return extracted text and source type for the file at ``path``."""
+    path = Path(path)
+    return read_bytes(path.read_bytes(), path.name, ocr_key, ocr_workers)
+
+
+def log_certificates(
+    original_data,
+    final_data,
+    event_text,
+    source="pasted",
+    global_comment="",
+    log_dir="logs",
+    session=None,
+):
+    """Queue the approved certificates for the background log writer.
+
+    Returns the batch ID. With a ``session`` ID, logging the same approved
+    certificates again in that session is a no-op; without one, every call
+    is logged.
+    """
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    placeholder = {
+        "name": "",
+        "title": "",
+        "organization": "",
+        "commendation": "",
+    }
+    entries = []
+    for idx, final in enumerate(final_data):
+        if not final.get("approved"):
+            continue
+        original = original_data[idx] if idx < len(original_data) else placeholder
+        entries.append(
+            {
+                "timestamp": timestamp,
+                "source": source,
+                "category": final.get("Category", ""),
+                "event_text": event_text[:1000],
+                "original_name": original.get("name", ""),
+                "final_name": final.get("Name", ""),
+                "original_title": original.get("title", ""),
+                "final_title": final.get("Title", ""),
+                "original_organization": original.get("organization", ""),
+                "final_organization": final.get("Organization", ""),
+                "original_commendation": original.get("commendation", ""),
+                "final_commendation": final.get("Certificate_Text", ""),
+                "approved": True,
+                "reviewer_comment": final.get("reviewer_comment", ""),
+                "global_comment": global_comment,
+            }
+        )
+    batch = batch_id(entries, session) if session else None
+    return get_log_writer(log_dir).submit(entries, batch)
+
+
+def load_example_certificates(n=3, log_dir="logs", category=None):
+    """Return up to ``n`` recent approved certificates from the log store."""
+    if not Path(log_dir).exists():
+        return []
+    return get_log_store(log_dir).examples(n, category=category)
+
+
+def format_examples(examples) -> str:
+    """Return approved certificates formatted as few-shot prompt examples."""
+    blocks = []
+    for idx, ex in enumerate(examples, 1):
+        blocks.append(
+            f"Example {idx} ({ex.get('category') or 'General'}):\n"
+            f"Name: {ex.get('final_name', '')}\nTitle: {ex.get('final_title', '')}\n"
+            f"Organization: {ex.get('final_organization', '')}\n"
+            f"Commendation:\n{ex.get('final_commendation', '')}"
+        )
+    return "\n\n".join(blocks)
+
+
+def build_extraction_prompt(event_date, uniform=False, flyer=False, examples=()) -> str:
+    """Return the system prompt used by :func:`extract_certificates`.
+
+    ``examples`` are approved certificates from similar past requests; they
+    are appended as a guide to the preferred commendation style.
+    """
+    flyer_note = ""
+    if flyer:
+        flyer_note = (
+            "The following text was extracted from a flyer image. Extract only real, explicitly named individuals or organizations. "
+            "Do not create placeholder names or titles. If a hosting or sponsoring organization is clearly listed, generate a certificate entry for that organization. "
+            "Do not generate certificates for event themes or generic phrases.\n\n"
+        )
+
+    if uniform:
+        prompt = f"""
+{flyer_note}You will be given the full text of a certificate request. Your task is to extract ALL individual certificates mentioned. Only include real named individuals or organizations. If a host or sponsor is clearly listed, create a certificate entry for that organization. Do not fabricate names or titles, and skip generic event themes.
+
+Return JSON with two keys:
+  template: a commendation using placeholders {{name}}, {{title}}, and {{organization}}
+  certificates: list of certificates each with name, title, organization (if applicable), date_raw, category, optional possible_split and alternatives
+
+Each commendation must begin with "On behalf of the California State Legislature, {{opening}}" where {{opening}} is a brief phrase like "congratulations on", "honoring", or "celebrating" selected according to the certificate's category.
+
+The event date is: {event_date}
+
+Name values must be no longer than {NAME_MAX_CHARS} characters including spaces. Title values must be no longer than {TITLE_MAX_CHARS} characters including spaces. Certificate text should be around {TEXT_MAX_CHARS} characters or fewer and at most {TEXT_MAX_LINES} lines.
+
+If some fields are missing, leave them blank rather than skipping the entry. We still want partial results.
+
+Return ONLY valid JSON.
+"""
+    else:
+        prompt = f"""
+{flyer_note}You will be given the full text of a certificate request. Your task is to extract ALL individual certificates mentioned, and for each one. Only include real named individuals or organizations. If a hosting or sponsor organization is clearly listed, create a certificate entry for that organization. Do not fabricate names or titles, and skip certificates for event themes or generic phrases:
+
+- Carefully interpret the context of the event and the nature of each person's recognition
+- If more than one name or organization appears in a single entry, set \"possible_split\": true
+- If you're uncertain about name, title, or org, return multiple options inside \"alternatives\"
+- If an organization appears to be hosting the event, omit it from the recipient's title
+- Only include "title" of "organization" when someone from that organization is receiving recognition from the host
+
+Each certificate must include:
+- name
+- title
+- organization (if applicable)
+- date_raw (or fallback to event date)
+- category: short (2–3 word) description of the recognition type
+- commendation: 3 sentence message that honors their work and ends with well wishes. Start each commendation with "On behalf of the California State Legislature, {{opening}}" where {{opening}} is a brief phrase like "congratulations on", "honoring", or "celebrating" chosen according to the certificate's category.
+- optional: possible_split (true/false)
+- optional: alternatives (dictionary)
+
+The event date is: {event_date}
+
+Name values must be no longer than {NAME_MAX_CHARS} characters including spaces. Title values must be no longer than {TITLE_MAX_CHARS} characters including spaces. Certificate text should be around {TEXT_MAX_CHARS} characters or fewer and at most {TEXT_MAX_LINES} lines.
+
+If some fields cannot be determined, leave them empty instead of omitting the certificate entirely.
+
+Return ONLY valid JSON.
+"""
+    if examples:
+        prompt += (
+            "\nThese approved certificates from similar past requests show the preferred "
+            "commendation style. Use them as a guide only; never copy their names or details.\n\n"
+            + format_examples(examples)
+            + "\n"
+        )
+    return prompt
+
+
+def uniform_template_text(template):
+    """Return the uniform commendation ``template`` with its closing wish."""
+    if "wish you the best" not in template.lower():
+        template = template.rstrip(" .") + " Wish you the best."
+    return template
+
+
+def certificate_row(parsed, event_date, template_text="", uniform=False, context=""):
+    """Return the review row for one certificate parsed from the LLM reply."""
+    name = parsed.get("name") or "Recipient"
+    title = parsed.get("title") or ""
+    org = parsed.get("organization") or ""
+    category = parsed.get("category", "General")
+    if uniform:
+        commendation = template_text
+        commendation = commendation.replace("{name}", name)
+        commendation = commendation.replace("{title}", title)
+        commendation = commendation.replace("{organization}", org)
+        commendation = normalize_spacing(commendation)
+    else:
+        commendation = parsed.get("commendation") or ""
+
+    if title.strip().lower() == "certificate of recognition":
+        title = ""
+
+    if not commendation.strip():
+        commendation = enhanced_commendation(name, title, org, category, context)
+
+    commendation = enforce_first_person(commendation)
+
+    return {
+        "Name": name,
+        "Title": title,
+        "Organization": org,
+        "Certificate_Text": commendation,
+        "Formatted_Date": format_certificate_date(parsed.get("date_raw") or event_date),
+        "Category": category,
+        "Tone_Category": "📝",
+        "possible_split": parsed.get("possible_split", False),
+        "alternatives": parsed.get("alternatives", {}),
+        "Name_Size": determine_name_font_size(name),
+        "Title_Size": determine_title_font_size(format_display_title(title, org)),
+        "Text_Size": determine_text_font_size(commendation),
+        "Date_Size": 12
+    }
+
+
+def extract_certificates(
+    event_text,
+    event_date,
+    uniform=False,
+    source_type="",
+    context=None,
+    client=None,
+    examples=(),
+    on_certificate=None,
+):
+    """Call the LLM to parse certificate information from the event text.
+
+    ``context`` is the raw request text used to pick a fallback commendation
+    tone; it defaults to ``event_text``. ``examples`` are passed on to
+    :func:`build_extraction_prompt`. They may also be given as a callable
+    returning them, which is only called when the reply is not cached.
+    Replies are cached on the request text and the prompt without examples,
+    so a growing example index does not invalidate them.
+
+    With ``on_certificate`` the completion is streamed and the callback gets
+    each certificate row as soon as the model finishes writing it. Every
+    returned row is passed to it exactly once, including rows from a cached
+    reply, which are delivered after it has been parsed.
+    """
+    client = client or get_client()
+    if context is None:
+        context = event_text
+    template_text = ""
+
+    # Normalize any date strings in the OCR text before sending to GPT
+    event_text = normalize_date_strings(event_text)
+
+    flyer = source_type == "flyer"
+    cache_key = PersistentCache.make_key(
+        OPENAI_MODEL,
+        build_extraction_prompt(event_date, uniform=uniform, flyer=flyer),
+        " ".join(event_text.split()),
+        uniform,
+    )
+
+    def system_prompt():
+        found = examples() if callable(examples) else examples
+        return build_extraction_prompt(event_date, uniform=uniform, flyer=flyer, examples=found)
+
+    streamed = []
+    pending = []
+
+    def stream_item(item, fields):
+        # Uniform rows need the template, which the model writes first.
+        pending.append(item)
+        if uniform and "template" not in fields:
+            return
+        template = uniform_template_text(fields.get("template", "")) if uniform else ""
+        for parsed in pending:
+            row = certificate_row(parsed, event_date, template, uniform, context)
+            streamed.append(row)
+            on_certificate(row)
+        pending.clear()
+
+    data = _complete_json(
+        client,
+        system_prompt,
+        event_text,
+        cache_key=cache_key,
+        on_item=stream_item if on_certificate is not None else None,
+    )
+
+    if uniform:
+        template_text = uniform_template_text(data.get("template", ""))
+        parsed_entries = data.get("certificates", [])
+    else:
+        # handle both raw list and wrapped dict formats
+        if isinstance(data, dict) and "certificates" in data:
+            parsed_entries = data.get("certificates", [])
+        else:
+            parsed_entries = data
+
+    if not isinstance(parsed_entries, list):
+        # Allow a single certificate dictionary by wrapping it in a list
+        if isinstance(parsed_entries, dict):
+            parsed_entries = [parsed_entries]
+        else:
+            raise ValueError("Parsed entries must be a list of certificates")
+
+    cert_rows = [
+        certificate_row(parsed, event_date, template_text, uniform, context)
+        for parsed in parsed_entries
+    ]
+    if on_certificate is not None:
+        for row in cert_rows[len(streamed):]:
+            on_certificate(row)
+
+    return parsed_entries, cert_rows, template_text
+
+
+def split_request_text(text, max_chars=EXTRACT_CHUNK_CHARS):
+    """Split ``text`` into chunks of at most ``max_chars`` characters.
+
+    Splits prefer page breaks, then paragraphs, lines and sentences, so an
+    honoree's entry is only cut when a single sentence is longer than
+    ``max_chars``. Adjacent pieces are packed together up to the limit.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+    return _pack_pieces(_split_pieces(text, max_chars), max_chars)
+
+
+def _split_pieces(text, max_chars, level=0):
+    if len(text) <= max_chars:
+        return [text]
+    if level == len(_SPLIT_PATTERNS):
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+    pieces = []
+    for part in _SPLIT_PATTERNS[level].split(text):
+        part = part.strip()
+        if part:
+            pieces.extend(_split_pieces(part, max_chars, level + 1))
+    return pieces
+
+
+def _pack_pieces(pieces, max_chars):
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _certificate_key(parsed):
+    """Return the identity used to merge certificates found in several chunks.
+
+    Entries without a name have no identity and return ``None``; they are
+    never merged.
+    """
+    key = tuple(
+        " ".join(re.sub(r"[^\w\s]", " ", str(parsed.get(field) or "")).lower().split())
+        for field in ("name", "organization")
+    )
+    return key if key[0] else None
+
+
+def _extract_chunk(chunk, header, event_date, kwargs):
+    """Return ``(parsed_entries, cert_rows, template)`` for one chunk.
+
+    A chunk whose reply is still truncated is halved and retried.
+    """
+    text = f"{header}\n\n{chunk}" if header else chunk
+    try:
+        return extract_certificates(text, event_date, **kwargs)
+    except json.JSONDecodeError:
+        if len(chunk) <= EXTRACT_MIN_CHUNK_CHARS:
+            raise
+    parsed_entries, cert_rows, template = [], [], ""
+    for part in split_request_text(chunk, max(EXTRACT_MIN_CHUNK_CHARS, len(chunk) // 2 + 1)):
+        part_parsed, part_rows, part_template = _extract_chunk(part, header, event_date, kwargs)
+        parsed_entries += part_parsed
+        cert_rows += part_rows
+        template = template or part_template
+    return parsed_entries, cert_rows, template
+
+
+def extract_certificates_chunked(
+    event_text,
+    event_date,
+    uniform=False,
+    source_type="",
+    context=None,
+    client=None,
+    examples=(),
+    on_certificate=None,
+    chunk_chars=EXTRACT_CHUNK_CHARS,
+    max_workers=EXTRACT_MAX_WORKERS,
+):
+    """Extract certificates from a request of any length.
+
+    Requests up to ``chunk_chars`` go through :func:`extract_certificates`
+    unchanged. Longer ones are split with :func:`split_request_text`, each
+    chunk is extracted concurrently (at most ``max_workers`` calls at once),
+    and the results are merged in document order. A certificate that repeats
+    one from an earlier chunk, matched by name and organization, is dropped,
+    since chunks may overlap. Repeats within a chunk and entries without a
+    name are kept. In uniform mode every row uses the template from the first
+    chunk that returned one.
+
+    A request that fits one chunk but whose reply is truncated is split in
+    half and extracted as above.
+
+    ``on_certificate`` receives each returned row once, from the calling
+    thread, as soon as the chunks before it have finished. Rows already
+    streamed before a truncated reply are not delivered again.
+    """
+    if callable(examples):
+        # Look the examples up at most once, for whichever chunk misses first.
+        examples = lru_cache(maxsize=None)(examples)
+    streamed = Counter()
+
+    def row_key(row):
+        return _certificate_key({"name": row["Name"], "organization": row["Organization"]})
+
+    def stream(row):
+        streamed[row_key(row)] += 1
+        on_certificate(row)
+
+    def deliver(row):
+        key = row_key(row)
+        if streamed[key]:
+            streamed[key] -= 1
+        else:
+            on_certificate(row)
+
+    chunks = split_request_text(event_text, chunk_chars)
+    if len(chunks) <= 1:
+        try:
+            return extract_certificates(
+                event_text,
+                event_date,
+                uniform=uniform,
+                source_type=source_type,
+                context=context,
+                client=client,
+                examples=examples,
+                on_certificate=stream if on_certificate is not None else None,
+            )
+        except json.JSONDecodeError:
+            if len(event_text.strip()) <= EXTRACT_MIN_CHUNK_CHARS:
+                raise
+        chunks = split_request_text(event_text, len(event_text.strip()) // 2 + 1)
+
+    client = client or get_client()
+    if context is None:
+        context = event_text
+    kwargs = dict(
+        uniform=uniform,
+        source_type=source_type,
+        context=context,
+        client=client,
+        examples=examples,
+    )
+    # The opening paragraph usually names the event; later chunks need it too.
+    first = _SPLIT_PATTERNS[1].split(chunks[0], 1)[0].strip()
+    header = first if len(first) <= EXTRACT_HEADER_CHARS else ""
+
+    parsed_entries = []
+    cert_rows = []
+    template_text = ""
+    seen = set()
+    results = {}
+    next_chunk = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        futures = {
+            pool.submit(_extract_chunk, chunk, header if idx else "", event_date, kwargs): idx
+            for idx, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            # Merge finished chunks in document order.
+            while next_chunk in results:
+                chunk_parsed, chunk_rows, chunk_template = results.pop(next_chunk)
+                next_chunk += 1
+                template_text = template_text or chunk_template
+                chunk_keys = set()
+                for parsed, row in zip(chunk_parsed, chunk_rows):
+                    key = _certificate_key(parsed)
+                    if key is not None:
+                        if key in seen:
+                            continue
+                        chunk_keys.add(key)
+                    if uniform and chunk_template != template_text:
+                        row = certificate_row(parsed, event_date, template_text, uniform, context)
+                    parsed_entries.append(parsed)
+                    cert_rows.append(row)
+                    if on_certificate is not None:
+                        deliver(row)
+                seen |= chunk_keys
+
+    return parsed_entries, cert_rows, template_text
+
+
+def regenerate_certificate(cert, global_comment="", reviewer_comment="", client=None):
+    """Use reviewer comments to refine an existing certificate via the LLM."""
+    instructions = []
+    if global_comment.strip():
+        instructions.append(f"Modify All comment: {global_comment.strip()}")
+    if reviewer_comment.strip():
+        instructions.append(f"Reviewer comment: {reviewer_comment.strip()}")
+
+    if not instructions:
+        return cert
+
+    client = client or get_client()
+    prompt = "\n".join(instructions)
+    system = (
+        "You update certificate details based on reviewer comments and correct grammar. "
+        f"Name must be ≤ {NAME_MAX_CHARS} characters. Title must be ≤ {TITLE_MAX_CHARS} characters. "
+        f"Certificate text must not exceed {TEXT_MAX_CHARS} characters and {TEXT_MAX_LINES} lines. "
+        "Return ONLY valid JSON with keys name, title, organization, date_raw, commendation."
+    )
+
+    user_msg = (
+        f"Current certificate:\n"
+        f"Name: {cert['Name']}\n"
+        f"Title: {cert['Title']}\n"
+        f"Organization: {cert['Organization']}\n"
+        f"Formatted_Date: {cert['Formatted_Date']}\n"
+        f"Commendation: {cert['Certificate_Text']}\n\n"
+        f"{prompt}"
+    )
+
+    updated = _complete_json(client, system, user_msg)
+
+    cert["Name"] = updated.get("name", cert["Name"])
+    cert["Title"] = updated.get("title", cert["Title"])
+    cert["Organization"] = updated.get("organization", cert["Organization"])
+    if "commendation" in updated:
+        cert["Certificate_Text"] = enforce_first_person(updated["commendation"])
+    else:
+        cert["Certificate_Text"] = enforce_first_person(cert["Certificate_Text"])
+    if updated.get("date_raw"):
+        cert["Formatted_Date"] = format_certificate_date(updated["date_raw"])
+    return cert
+
+
+def regenerate_certificates(
+    certs,
+    global_comment="",
+    max_workers=REGEN_MAX_WORKERS,
+    progress=None,
+    client=None,
+):
+    """Regenerate every certificate concurrently.
+
+    At most ``max_workers`` LLM calls are in flight at once, so the batch
+    takes roughly as long as the slowest call. Returns ``(rows, errors)``:
+    ``rows`` keeps the input order and holds the original certificate for
+    any item that failed, and ``errors`` lists ``(index, exception)`` pairs.
+    ``progress`` is called as ``progress(done, total)`` from the calling
+    thread after each certificate finishes.
+    """
+    client = client or get_client()
+    rows = list(certs)
+    errors = []
+    if not rows:
+        return rows, errors
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rows)))) as pool:
+        futures = {
+            pool.submit(regenerate_certificate, cert, global_comment, "", client): idx
+            for idx, cert in enumerate(rows)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            try:
+                rows[idx] = future.result()
+            except Exception as exc:  # noqa: BLE001
+                errors.append((idx, exc))
+            if progress:
+                progress(done, len(rows))
+    errors.sort(key=lambda item: item[0])
+    return rows, errors
+
+
+def apply_global_comment(cert_rows, global_comment):
+    """Apply simple global instructions to all certificates."""
+    if not global_comment.strip():
+        return cert_rows
+
+    comment = global_comment.lower()
+
+    # Set a single organization for all certificates
+    org_match = re.search(r"organization(?: name)?(?: for all certificates)?\s*(?:is|=|:)\s*['\"]?([^'\"\n]+)['\"]?", comment)
+    if org_match:
+        org_value = org_match.group(1).strip()
+        for cert in cert_rows:
+            cert["Organization"] = org_value
+
+    # Replace the entire title with the organization text
+    if ("use organization instead of title" in comment or
+            "replace title with organization" in comment):
+        for cert in cert_rows:
+            cert["Title"] = cert.get("Organization", "")
+            cert["Title_Size"] = determine_title_font_size(
+                format_display_title(cert["Title"], cert["Organization"])
+            )
+
+    # Replace a specific word in the title with the organization text
+    replace_word = re.search(
+        r"replace ['\"]?([^'\"]+)['\"]? in title with organization",
+        comment,
+    )
+    if replace_word:
+        target = replace_word.group(1).strip()
+        for cert in cert_rows:
+            cert["Title"] = cert.get("Title", "").replace(target, cert.get("Organization", ""))
+            cert["Title_Size"] = determine_title_font_size(
+                format_display_title(cert["Title"], cert["Organization"])
+            )
+
+    texts = enforce_first_person_many(cert.get("Certificate_Text", "") for cert in cert_rows)
+    for cert, text in zip(cert_rows, texts):
+        cert["Certificate_Text"] = text
+
+    return cert_rows
+
+
+def improve_certificate(cert, client=None):
+    """Use GPT to suggest improvements for a manually entered certificate."""
+    client = client or get_client()
+    system = (
+        "You suggest concise improvements and correct grammar for a certificate entry. "
+        f"Name must be <= {NAME_MAX_CHARS} characters. "
+        f"Title must be <= {TITLE_MAX_CHARS} characters. "
+        f"Certificate text must be <= {TEXT_MAX_CHARS} characters and {TEXT_MAX_LINES} lines. "
+        "Return ONLY valid JSON with keys name, title, organization, certificate_text."
+    )
+    user_msg = (
+        f"Name: {cert['Name']}\n"
+        f"Title: {cert['Title']}\n"
+        f"Organization: {cert['Organization']}\n"
+        f"Certificate Text: {cert['Certificate_Text']}\n\n"
+        "Provide improved values."
+    )
+    data = _complete_json(client, system, user_msg)
+    if "certificate_text" in data:
+        data["certificate_text"] = enforce_first_person(data["certificate_text"])
+    return data
+
+
+def _new_word_document():
+    """Return an empty certificate document with the letter-size page setup."""
+    doc = Document()
+    _apply_page_setup(doc.sections[0])
+    return doc
+
+
+def _apply_page_setup(section):
+    section.page_height = Inches(11)
+    section.page_width = Inches(8.5)
+    section.top_margin = Inches(1)
+    section.bottom_margin = Inches(0.25)
+    section.left_margin = Inches(.75)
+    section.right_margin = Inches(.75)
+
+
+def _add_certificate_page(doc, entry):
+    """Append the paragraphs for one certificate page to ``doc``."""
+    # Initial spacer so the name block begins 4.5" from the top
+    p_spacer = doc.add_paragraph()
+    p_spacer.paragraph_format.space_before = Pt(225)  # 3.5" after 1" margin
+    p_spacer.add_run(" ").font.size = Pt(12)
+
+    name_size = determine_name_font_size(entry["Name"])
+    display_title = format_display_title(entry["Title"], entry["Organization"])
+    title_size = determine_title_font_size(display_title)
+    text_size = determine_text_font_size(entry["Certificate_Text"])
+
+    p_name = doc.add_paragraph()
+    run_name = p_name.add_run(entry["Name"])
+    p_name.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run_name.bold = True
+    run_name.font.name = "Times New Roman"
+    run_name.font.size = Pt(name_size)
+    p_name.paragraph_format.space_after = Pt(3)
+
+    if display_title.strip():
+        p_title = doc.add_paragraph()
+        run_title = p_title.add_run(display_title)
+        p_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run_title.bold = True
+        run_title.font.name = "Times New Roman"
+        run_title.font.size = Pt(title_size)
+
+    p_text = doc.add_paragraph()
+    run_text = p_text.add_run(entry["Certificate_Text"])
+    p_text.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p_text.paragraph_format.space_before = Pt(18)
+    run_text.font.name = "Times New Roman"
+    run_text.font.size = Pt(text_size)
+
+    # Spacer to position date block starting at 8.25" from the top
+    spacer_gap = doc.add_paragraph()
+    spacer_gap.paragraph_format.space_before = Pt(25)  # 0.5"
+    spacer_gap.add_run(" ").font.size = Pt(12)
+
+    for idx, line in enumerate(entry["Formatted_Date"].split("\n")):
+        p_date = doc.add_paragraph()
+        run_date = p_date.add_run(line)
+        p_date.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        p_date.paragraph_format.space_before = Pt(0 if idx > 0 else 0)
+        p_date.paragraph_format.space_after = Pt(0)
+        run_date.font.name = "Times New Roman"
+        run_date.font.size = Pt(entry.get("Date_Size", 12))
+
+    # Spacer before signature block (1.25")
+    sig_spacer = doc.add_paragraph()
+    sig_spacer.paragraph_format.space_before = Pt(40)
+    sig_spacer.add_run(" ").font.size = Pt(12)
+
+
+def _add_page_break(doc):
+    """Start a new letter-size section on a new page."""
+    _apply_page_setup(doc.add_section(WD_SECTION.NEW_PAGE))
+
+
+def _add_signature_block(doc):
+    for line, size in [
+            ("_____________________________________", 12),
+            ("Stan Ellis", 14),
+            ("Assemblyman, 32nd District", 14)
+        ]:
+            sig = doc.add_paragraph(line)
+            sig.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+            sig.paragraph_format.space_before = Pt(0)
+            sig.paragraph_format.space_after = Pt(0)
+            sig.runs[0].font.name = "Times New Roman"
+            sig.runs[0].font.size = Pt(size)
+
+
+_RUN_BREAK_CHARS = re.compile(r"[\t\r\n]")
+
+
+@lru_cache(maxsize=16)
+def _word_page_prototype(has_title: bool, date_lines: int):
+    """Return the paragraphs of a placeholder page built once through python-docx.
+
+    Callers clone the elements and substitute each recipient's text, which
+    produces the same XML as building the page through the python-docx API.
+    """
+    doc = _new_word_document()
+    _add_certificate_page(
+        doc,
+        {
+            "Name": "Name",
+            "Title": "Title" if has_title else "",
+            "Organization": "",
+            "Certificate_Text": "Text",
+            "Formatted_Date": "\n".join(["Date"] * date_lines),
+        },
+    )
+    return tuple(doc.element.body.iterchildren(qn("w:p")))
+
+
+@lru_cache(maxsize=1)
+def _word_page_break():
+    """Return the section-break paragraph that separates certificate pages."""
+    doc = _new_word_document()
+    _add_page_break(doc)
+    return list(doc.element.body.iterchildren(qn("w:p")))[-1]
+
+
+def _set_run(paragraph, text, size=None):
+    run = paragraph.r_lst[0]
+    t = run.find(qn("w:t"))
+    if text and t is not None and not _RUN_BREAK_CHARS.search(text):
+        # Same markup python-docx writes for plain text, without its per-character loop
+        t.text = text
+        if len(text.strip()) < len(text):
+            t.set(qn("xml:space"), "preserve")
+    else:
+        run.text = text
+    if size is not None:
+        run.get_or_add_rPr().sz_val = Pt(size)
+
+
+def word_page_fragment(entry):
+    """Return detached paragraph elements for one certificate page.
+
+    The page is cloned from a cached prototype with the entry's text and
+    sizes substituted in.
+    """
+    display_title = format_display_title(entry["Title"], entry["Organization"])
+    has_title = bool(display_title.strip())
+    date_lines = entry["Formatted_Date"].split("\n")
+
+    paragraphs = [deepcopy(p) for p in _word_page_prototype(has_title, len(date_lines))]
+    _set_run(paragraphs[1], entry["Name"], determine_name_font_size(entry["Name"]))
+    pos = 2
+    if has_title:
+        _set_run(paragraphs[pos], display_title, determine_title_font_size(display_title))
+        pos += 1
+    _set_run(
+        paragraphs[pos],
+        entry["Certificate_Text"],
+        determine_text_font_size(entry["Certificate_Text"]),
+    )
+    pos += 2
+    date_size = entry.get("Date_Size", 12)
+    for line in date_lines:
+        _set_run(paragraphs[pos], line, date_size)
+        pos += 1
+    return paragraphs
+
+
+def assemble_word_document(fragments):
+    """Return a Word document built from page fragments, in order.
+
+    The fragments' elements are moved into the document, so pass copies of
+    anything that must be reused.
+    """
+    doc = _new_word_document()
+    sentinel = doc.element.body.sectPr
+    for i, paragraphs in enumerate(fragments):
+        if i > 0:
+            sentinel.addprevious(deepcopy(_word_page_break()))
+        for p in paragraphs:
+            sentinel.addprevious(p)
+    _add_signature_block(doc)
+    return doc
+
+
+def generate_word_certificates(entries):
+    """Return a Word document with one certificate page per entry.
+
+    Each page is cloned from a cached prototype fragment instead of being
+    rebuilt paragraph by paragraph, which keeps large batches fast.
+    """
+    return assemble_word_document(word_page_fragment(entry) for entry in entries)
+
+
+def generate_pdf_certificates(entries):
+    """Return PDF bytes with one certificate page per entry."""
+    buffer = BytesIO()
+    _draw_pdf_certificates(entries, buffer)
+    buffer.seek(0)
+    return buffer.read()
+
+
+def write_pdf_certificates(entries, path):
+    """Render certificates straight to the PDF file at ``path``."""
+    _draw_pdf_certificates(entries, str(path))
+    return path
+
+
+def _draw_pdf_certificates(entries, target):
+    c = canvas.Canvas(target, pagesize=letter)
+    page_width, page_height = letter
+    left_margin = right_margin = 0.75 * inch
+
+    for i, entry in enumerate(entries):
+        if i > 0:
+            c.showPage()
+
+        name_size = determine_name_font_size(entry["Name"])
+        display_title = format_display_title(entry["Title"], entry["Organization"])
+        title_size = determine_title_font_size(display_title)
+        title_provided = bool(entry.get("Title", "").strip())
+        title_not_provided = not title_provided
+        text_size = determine_text_font_size(entry["Certificate_Text"])
+        date_size = 12
+
+        center_x = page_width / 2
+        avail_width = page_width - left_margin - right_margin
+
+        c.setFont("Times-Bold", name_size)
+        name_y = page_height - 5.0 * inch
+        c.drawCentredString(center_x, name_y, entry["Name"])
+        text_start_y = name_y
+
+        if title_not_provided:
+            c.setFont("Times-Roman", text_size)
+            y = text_start_y - 0.5 * inch
+            for line in wrap_text(entry["Certificate_Text"], "Times-Roman", text_size, avail_width):
+                c.drawCentredString(center_x, y, line)
+                y -= text_size * 1.2
+
+        if title_provided:
+            c.setFont("Times-Bold", title_size)
+            title_y = text_start_y - 0.55 * inch
+            c.drawCentredString(center_x, title_y, display_title)
+            text_start_y = title_y - title_size * 1.2
+
+            c.setFont("Times-Roman", text_size)
+            y = text_start_y
+            for line in wrap_text(entry["Certificate_Text"], "Times-Roman", text_size, avail_width):
+                c.drawCentredString(center_x, y, line)
+                y -= text_size * 1.2
+
+        c.setFont("Times-Roman", date_size)
+        y = page_height - 8.75 * inch
+        for line in entry["Formatted_Date"].split("\n"):
+            c.drawCentredString(center_x, y, line)
+            y -= date_size * 1.2
+
+        right_x = page_width - right_margin
+        c.setFont("Times-Roman", 12)
+        y = page_height - 10.0 * inch
+        c.drawRightString(right_x, y, "_____________________________________")
+        c.setFont("Times-Roman", 14)
+        c.drawRightString(right_x, y - 14 * 1.2, "Stan Ellis")
+        c.drawRightString(right_x, y - 14 * 2.4, "Assemblyman, 32nd District")
+
+    c.save()
+
+
+def render_pdf_sharded(entries, workers=None, shard_size=PDF_SHARD_SIZE, output_path=None):
+    """Render certificates across worker processes and merge the shards in order.
+
+    Entries are split into shards of ``shard_size``; each worker writes its
+    shard to a temporary file, and the shards are merged with PyMuPDF's
+    ``insert_pdf``. With ``output_path`` the merged PDF is written there and
+    the path is returned; otherwise the PDF bytes are returned. Batches that
+    fit in one shard are rendered in-process.
+    """
+    entries = list(entries)
+    if len(entries) <= shard_size:
+        if output_path is not None:
+            return write_pdf_certificates(entries, output_path)
+        return generate_pdf_certificates(entries)
+
+    shards = [entries[i:i + shard_size] for i in range(0, len(entries), shard_size)]
+    with tempfile.TemporaryDirectory(prefix="cert_shards_") as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"shard_{n:05d}.pdf") for n in range(len(shards))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(write_pdf_certificates, shards, paths))
+
+        with fitz.open() as merged:
+            for path in paths:
+                with fitz.open(path) as shard:
+                    merged.insert_pdf(shard)
+            if output_path is not None:
+                merged.save(str(output_path), deflate=True)
+                return output_path
+            return merged.tobytes(deflate=True)
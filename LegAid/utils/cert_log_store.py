@@ -0,0 +1,226 @@
+"""Indexed SQLite store for approved-certificate logs.
+
+``log_certificates`` keeps appending to the daily ``cert_logs_*.jsonl`` files
+and mirrors each approved entry here, so example lookups are a bounded,
+indexed query instead of a scan of every log file. Existing JSONL logs,
+including rotated ``.jsonl.gz`` segments, are imported the first time a store
+is opened.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+STORE_NAME = "cert_logs.sqlite3"
+
+LOG_FIELDS = (
+    "timestamp",
+    "source",
+    "category",
+    "event_text",
+    "original_name",
+    "final_name",
+    "original_title",
+    "final_title",
+    "original_organization",
+    "final_organization",
+    "original_commendation",
+    "final_commendation",
+    "reviewer_comment",
+    "global_comment",
+)
+
+# Examples are sampled from this many of the most recent matches per request
+EXAMPLE_POOL_FACTOR = 10
+
+# Submission IDs only need to catch repeats within one review session
+SUBMISSION_TTL_SECONDS = 24 * 60 * 60
+
+
+def log_day(name: str) -> str:
+    """Return the daily log a file name belongs to, e.g. ``cert_logs_2024-05-31``."""
+    return name.split(".", 1)[0]
+
+
+def _read_log(log_file: Path) -> list[dict]:
+    """Return the approved entries of a JSONL log or gzipped log segment."""
+    opener = gzip.open if log_file.suffix == ".gz" else open
+    entries = []
+    with opener(log_file, "rt", encoding="utf-8") as f:
+        for line in f:
+            try:
+                cert = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if cert.get("approved"):
+                entries.append(cert)
+    return entries
+
+
+class CertificateLogStore:
+    """Approved certificates indexed by category and date."""
+
+    def __init__(self, log_dir: str | os.PathLike = "logs"):
+        self.log_dir = Path(log_dir)
+        self.path = self.log_dir / STORE_NAME
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not be shared with forked worker processes.
+        if self._conn is None or self._pid != os.getpid():
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False
+            )
+            columns = ", ".join(f"{field} TEXT NOT NULL DEFAULT ''" for field in LOG_FIELDS)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS certificates ("
+                f"id INTEGER PRIMARY KEY, date TEXT NOT NULL, {columns})"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS certificates_category_date "
+                "ON certificates (category, date)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS certificates_date ON certificates (date)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS imported_logs (name TEXT PRIMARY KEY)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS submissions "
+                "(batch_id TEXT PRIMARY KEY, created REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+            self._import_logs(self._conn)
+        return self._conn
+
+    def _import_logs(self, conn: sqlite3.Connection) -> None:
+        """Load JSONL logs written before the store existed."""
+        seen = {row[0] for row in conn.execute("SELECT name FROM imported_logs")}
+        days: dict[str, list[Path]] = {}
+        for log_file in sorted(self.log_dir.glob("cert_logs_*.jsonl*")):
+            days.setdefault(log_day(log_file.name), []).append(log_file)
+        for day, files in days.items():
+            if day in seen:
+                continue
+            for log_file in files:
+                self._insert(conn, _read_log(log_file))
+            conn.execute("INSERT INTO imported_logs (name) VALUES (?)", (day,))
+        conn.commit()
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entries) -> None:
+        placeholders = ", ".join("?" for _ in range(len(LOG_FIELDS) + 1))
+        conn.executemany(
+            f"INSERT INTO certificates (date, {', '.join(LOG_FIELDS)}) "
+            f"VALUES ({placeholders})",
+            [
+                (str(entry.get("timestamp", ""))[:10],)
+                + tuple(str(entry.get(field) or "") for field in LOG_FIELDS)
+                for entry in entries
+            ],
+        )
+
+    def add(self, entries, log_file: str | None = None, batch_id: str | None = None) -> bool:
+        """Index approved log ``entries`` and return whether they were new.
+
+        ``log_file`` names the JSONL file the entries were also appended to;
+        its day is marked as imported so a fresh store does not load them
+        twice. A ``batch_id`` already added in the last
+        ``SUBMISSION_TTL_SECONDS`` is ignored.
+        """
+        with self._lock:
+            conn = self._connect()
+            if batch_id is not None:
+                now = time.time()
+                conn.execute(
+                    "DELETE FROM submissions WHERE created < ?",
+                    (now - SUBMISSION_TTL_SECONDS,),
+                )
+                added = conn.execute(
+                    "INSERT OR IGNORE INTO submissions (batch_id, created) VALUES (?, ?)",
+                    (batch_id, now),
+                ).rowcount
+                if not added:
+                    conn.commit()
+                    return False
+            self._insert(conn, entries)
+            if log_file:
+                conn.execute(
+                    "INSERT OR IGNORE INTO imported_logs (name) VALUES (?)",
+                    (log_day(log_file),),
+                )
+            conn.commit()
+            return True
+
+    def prune(self, before: str) -> int:
+        """Delete certificates dated before day ``before`` (``YYYY-MM-DD``).
+
+        Called when the oldest log segments are deleted, so the store does
+        not outgrow the logs. Returns the number of certificates removed.
+        """
+        with self._lock:
+            conn = self._connect()
+            removed = conn.execute(
+                "DELETE FROM certificates WHERE date < ?", (before,)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM imported_logs WHERE name < ?", (f"cert_logs_{before}",)
+            )
+            conn.commit()
+            return removed
+
+    def examples(self, n: int = 3, category: str | None = None) -> list[dict]:
+        """Return up to ``n`` random recent approved certificates.
+
+        Only the ``n * EXAMPLE_POOL_FACTOR`` newest rows (optionally within
+        ``category``) are read.
+        """
+        if n <= 0:
+            return []
+        query = f"SELECT {', '.join(LOG_FIELDS)} FROM certificates"
+        params: list = []
+        if category:
+            query += " WHERE category = ?"
+            params.append(category)
+        query += " ORDER BY date DESC, id DESC LIMIT ?"
+        params.append(n * EXAMPLE_POOL_FACTOR)
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        pool = [dict(zip(LOG_FIELDS, row), approved=True) for row in rows]
+        return random.sample(pool, min(len(pool), n))
+
+    def entries(self) -> list[dict]:
+        """Return every indexed certificate, oldest first."""
+        query = f"SELECT {', '.join(LOG_FIELDS)} FROM certificates ORDER BY date, id"
+        with self._lock:
+            rows = self._connect().execute(query).fetchall()
+        return [dict(zip(LOG_FIELDS, row), approved=True) for row in rows]
+
+    def count(self) -> int:
+        """Return the number of indexed certificates."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+
+
+_stores: dict[Path, CertificateLogStore] = {}
+
+
+def get_log_store(log_dir: str | os.PathLike = "logs") -> CertificateLogStore:
+    """Return the shared store for ``log_dir``."""
+    key = Path(log_dir).resolve()
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = CertificateLogStore(log_dir)
+    return store
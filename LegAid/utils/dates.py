@@ -0,0 +1,94 @@
+"""Date patterns and memoized date parsing shared by LegAid tools.
+
+Request texts mention the same few dates many times, and the CertCreate page
+parses the same strings on every rerun, so parses are memoized. Strict ISO
+and numeric dates are converted directly instead of through dateutil's fuzzy
+parser.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from dateutil import parser as date_parser
+
+MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|"
+    r"May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|"
+    r"Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+
+# Every date pattern starts with a digit or one of these month initials.
+# Checking that first lets the scan skip most positions before trying the
+# month alternation, which dominates the cost on long texts.
+_DATE_START = r"(?=[\dADFJMNOS])"
+
+# Dates rewritten by ``normalize_date_strings``
+DATE_STRING_RE = re.compile(
+    _DATE_START
+    + "(?:"
+    + "|".join(
+        [
+            rf"{MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{2,4}})?(?:\s+[A-Za-z]+)*",
+            r"\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?",
+            rf"\d{{1,2}}(?:st|nd|rd|th)?\s+of\s+{MONTH}\.?(?:,?\s*\d{{2,4}})?",
+            r"\d{4}-\d{2}-\d{2}",
+        ]
+    )
+    + ")",
+    flags=re.IGNORECASE,
+)
+
+# Patterns tried in order by ``extract_event_date``
+EVENT_DATE_PATTERNS = tuple(
+    re.compile(_DATE_START + pattern, flags=re.IGNORECASE)
+    for pattern in (
+        rf"{MONTH}\.?[\s\t]+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{2,4}})?",
+        r"\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?",
+        rf"\d{{1,2}}(?:st|nd|rd|th)?\s+of\s+{MONTH}\.?(?:,?\s*\d{{2,4}})?",
+        r"\d{4}-\d{2}-\d{2}",
+    )
+)
+
+_ISO_RE = re.compile(r"\s*(\d{4})-(\d{2})-(\d{2})\s*")
+_NUMERIC_RE = re.compile(r"\s*(\d{1,2})([/-])(\d{1,2})\2(\d{4})\s*")
+
+
+def _strict_date(raw: str) -> datetime | None:
+    """Return ``raw`` parsed as ``YYYY-MM-DD`` or ``M/D/YYYY``, else ``None``.
+
+    Numeric dates are month first unless the first number can only be a day,
+    which is how dateutil reads them.
+    """
+    match = _ISO_RE.fullmatch(raw)
+    if match:
+        year, month, day = map(int, match.groups())
+    else:
+        match = _NUMERIC_RE.fullmatch(raw)
+        if not match:
+            return None
+        month, day, year = int(match[1]), int(match[3]), int(match[4])
+        if month > 12 >= day:
+            month, day = day, month
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_date(raw: str, default_year: int = 1900) -> datetime | None:
+    """Return ``raw`` parsed as a date, or ``None`` if it cannot be parsed.
+
+    Missing parts are taken from January 1 of ``default_year``. Anything
+    other than a strict ISO or numeric date is parsed fuzzily by dateutil.
+    """
+    dt = _strict_date(raw)
+    if dt is not None:
+        return dt
+    try:
+        return date_parser.parse(raw, fuzzy=True, default=datetime(default_year, 1, 1))
+    except Exception:
+        return None
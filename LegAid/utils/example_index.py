@@ -0,0 +1,142 @@
+"""Nearest-neighbour lookup of approved certificates for few-shot prompts.
+
+Approved certificates are embedded as they are logged and kept in a
+``modules.faiss_index.SemanticMemory`` under the log directory, so extraction
+prompts can carry the past certificates closest to the current request. A new
+index is first filled from the certificate log store, and examples older than
+the oldest remaining log are pruned along with the store. When
+``modules`` or FAISS cannot be imported, or the index cannot be opened, a
+warning is logged once and lookups return no examples.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+from .cert_log_store import get_log_store
+
+try:
+    from modules.faiss_index import SemanticMemory
+except ImportError as exc:  # faiss-cpu is optional for CertCreate
+    SemanticMemory = None
+    _IMPORT_ERROR = exc
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "cert_examples.faiss"
+METADATA_NAME = "cert_examples.pkl"
+EXAMPLE_FIELDS = (
+    "category",
+    "final_name",
+    "final_title",
+    "final_organization",
+    "final_commendation",
+)
+# Request text beyond this is not embedded for the lookup
+QUERY_MAX_CHARS = 4000
+
+
+def example_text(entry: dict) -> str:
+    """Return the text embedded for an approved certificate."""
+    return f"{entry.get('category') or 'General'}\n{entry.get('final_commendation', '')}"
+
+
+class CertificateExampleIndex:
+    """Vector index over approved certificate commendations and categories."""
+
+    def __init__(self, log_dir: str | os.PathLike = "logs", memory=None):
+        log_dir = Path(log_dir)
+        if memory is None:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            memory = SemanticMemory(
+                index_path=str(log_dir / INDEX_NAME),
+                metadata_path=str(log_dir / METADATA_NAME),
+            )
+        self.memory = memory
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.memory.index.ntotal
+
+    def add(self, entries) -> None:
+        """Embed approved log ``entries`` and add them to the index."""
+        entries = [e for e in entries if e.get("final_commendation")]
+        if not entries:
+            return
+        with self._lock:
+            self.memory.add(
+                [example_text(e) for e in entries],
+                [
+                    {
+                        **{field: e.get(field, "") for field in EXAMPLE_FIELDS},
+                        "date": str(e.get("timestamp", ""))[:10],
+                    }
+                    for e in entries
+                ],
+            )
+
+    def prune(self, before: str) -> None:
+        """Remove examples dated before day ``before`` (``YYYY-MM-DD``)."""
+        with self._lock:
+            expired = [
+                i for i, example in enumerate(self.memory.metadata)
+                if example.get("date", "") < before
+            ]
+            self.memory.remove(expired)
+
+    def search(self, query: str, n: int = 3) -> list[dict]:
+        """Return up to ``n`` distinct approved certificates closest to ``query``."""
+        with self._lock:
+            hits = self.memory.search(query[:QUERY_MAX_CHARS], top_k=n * 2)
+        examples = []
+        seen = set()
+        for example, _ in hits:
+            text = example.get("final_commendation")
+            if text in seen:
+                continue
+            seen.add(text)
+            examples.append(example)
+            if len(examples) == n:
+                break
+        return examples
+
+
+_indexes: dict[Path, CertificateExampleIndex | None] = {}
+
+
+def get_example_index(log_dir: str | os.PathLike = "logs") -> CertificateExampleIndex | None:
+    """Return the shared index for ``log_dir``, or ``None`` if it is unavailable."""
+    key = Path(log_dir).resolve()
+    if key not in _indexes:
+        index = None
+        if SemanticMemory is None:
+            logger.warning(
+                "Certificate example index unavailable, extraction prompts get no "
+                "examples: %s", _IMPORT_ERROR,
+            )
+        else:
+            try:
+                new = not (Path(log_dir) / INDEX_NAME).exists()
+                index = CertificateExampleIndex(log_dir)
+                if new:
+                    # Certificates logged before the index existed
+                    index.add(get_log_store(log_dir).entries())
+            except Exception:
+                logger.exception("Could not open the certificate example index")
+        _indexes[key] = index
+    return _indexes[key]
+
+
+def similar_examples(text: str, n: int = 3, log_dir: str | os.PathLike = "logs") -> list[dict]:
+    """Return up to ``n`` approved certificates similar to the request ``text``."""
+    index = get_example_index(log_dir)
+    if index is None or not len(index) or not text.strip():
+        return []
+    try:
+        return index.search(text, n)
+    except Exception:
+        logger.exception("Certificate example lookup failed")
+        return []
@@ -0,0 +1,98 @@
+"""Incremental parsing of streamed certificate replies.
+
+The extraction prompt asks for either a JSON array of certificates or an
+object whose ``certificates`` member is that array. ``CertificateStreamParser``
+is fed the reply as it streams in and returns each certificate object as soon
+as its closing brace arrives, so the page can show certificates before the
+completion finishes.
+"""
+
+from __future__ import annotations
+
+import json
+
+
+class CertificateStreamParser:
+    """Emit the objects of a streamed certificate array as they complete.
+
+    Objects are emitted when they are items of the top-level array, or of an
+    array that is a member of the top-level object. Top-level string members,
+    such as the uniform ``template``, are collected in ``fields``. Anything
+    before the first ``{`` or ``[`` (code fences, prose) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: dict[str, str] = {}
+        self.done = False
+        self._pos = 0
+        self._stack: list[tuple[str, int]] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key = None
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Add ``chunk`` to the reply and return the certificates it completed."""
+        self.text += chunk
+        items = []
+        text = self.text
+        stack = self._stack
+        for pos in range(self._pos, len(text)):
+            if self.done:
+                break
+            char = text[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(text[self._string_start : pos + 1])
+            elif not stack:
+                if char in "{[":
+                    stack.append((char, pos))
+                    self._expect_key = char == "{"
+            elif char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                stack.append((char, pos))
+            elif char in "}]":
+                opener, start = stack.pop()
+                if not stack:
+                    self.done = True
+                elif opener == "{" and self._is_item_array(stack):
+                    try:
+                        item = json.loads(text[start : pos + 1])
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(item, dict):
+                        items.append(item)
+            elif len(stack) == 1 and stack[0][0] == "{":
+                if char == ":":
+                    self._expect_key = False
+                elif char == ",":
+                    self._expect_key = True
+        self._pos = len(text)
+        return items
+
+    def _is_item_array(self, stack) -> bool:
+        # The top-level array, or an array member of the top-level object
+        if stack[-1][0] != "[":
+            return False
+        return len(stack) == 1 or (len(stack) == 2 and stack[0][0] == "{")
+
+    def _end_string(self, literal: str) -> None:
+        if len(self._stack) != 1 or self._stack[0][0] != "{":
+            return
+        try:
+            value = json.loads(literal)
+        except json.JSONDecodeError:
+            return
+        if self._expect_key:
+            self._key = value
+        elif self._key is not None:
+            self.fields[self._key] = value
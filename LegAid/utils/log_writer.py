@@ -0,0 +1,181 @@
+"""Background writer for approved-certificate logs.
+
+Batches are queued by ``log_certificates`` and written by a daemon thread, so
+the download handlers never touch the disk. A batch submitted with the ID of
+one already logged (for example when both the Word and PDF buttons are
+clicked in one review session) is dropped, and new batches are embedded into
+the few-shot example index. The daily JSONL file is gzipped into a numbered
+segment once it reaches ``max_bytes`` or its day has passed, and the oldest
+segments are deleted while they exceed ``max_total_bytes``, together with
+their certificates in the log store and the example index.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from datetime import date
+from pathlib import Path
+
+from .cache import PersistentCache
+from .cert_log_store import get_log_store, log_day
+from .example_index import get_example_index
+
+logger = logging.getLogger(__name__)
+
+LOG_SEGMENT_BYTES = 4 * 1024 * 1024
+LOG_TOTAL_BYTES = 256 * 1024 * 1024
+
+
+def batch_id(entries, session: str) -> str:
+    """Return an idempotency key for ``entries`` submitted during ``session``.
+
+    The same entries logged again in the same session get the same key. A
+    new session, such as a later review of the same request, gets a new one.
+    """
+    return PersistentCache.make_key(
+        session,
+        *({k: v for k, v in entry.items() if k != "timestamp"} for entry in entries),
+    )
+
+
+class CertificateLogWriter:
+    """Queue log batches and append them to rotating JSONL files."""
+
+    def __init__(
+        self,
+        log_dir: str | os.PathLike = "logs",
+        max_bytes: int = LOG_SEGMENT_BYTES,
+        max_total_bytes: int = LOG_TOTAL_BYTES,
+    ):
+        self.log_dir = Path(log_dir)
+        self.max_bytes = max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.store = get_log_store(log_dir)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def submit(self, entries, batch: str | None = None) -> str:
+        """Queue ``entries`` for writing and return the batch ID.
+
+        Without a ``batch`` ID the entries are always written.
+        """
+        entries = list(entries)
+        batch = batch or uuid.uuid4().hex
+        self._ensure_thread()
+        self._queue.put((batch, entries))
+        return batch
+
+    def flush(self) -> None:
+        """Block until every queued batch has been written."""
+        self._queue.join()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            # Threads do not survive a fork, so restart in child processes.
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="cert-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch, entries = self._queue.get()
+            try:
+                self._write(batch, entries)
+            except Exception:  # keep the writer alive for later batches
+                logger.exception("Could not write certificate log batch %s", batch)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, batch: str, entries: list[dict]) -> None:
+        if not entries:
+            return
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        day = str(entries[0].get("timestamp", ""))[:10] or date.today().isoformat()
+        log_file = self.log_dir / f"cert_logs_{day}.jsonl"
+        # A new example index is filled from the store, so open it before
+        # these entries reach the store or they are embedded twice.
+        index = get_example_index(self.log_dir)
+        # Index before appending so a first-time import of today's file does
+        # not pick these entries up a second time.
+        if not self.store.add(entries, log_file=log_file.name, batch_id=batch):
+            return
+        with log_file.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        if index is not None:
+            try:
+                index.add(entries)
+            except Exception:
+                logger.exception("Could not index certificate log batch %s", batch)
+        for path in self.log_dir.glob("cert_logs_*.jsonl"):
+            if path != log_file or path.stat().st_size >= self.max_bytes:
+                self._rotate(path)
+        self._prune()
+
+    def _rotate(self, path: Path) -> Path:
+        """Gzip a closed log file into the next numbered segment of its day."""
+        day = log_day(path.name)
+        index = 1
+        while (target := path.with_name(f"{day}.{index}.jsonl.gz")).exists():
+            index += 1
+        with path.open("rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()
+        return target
+
+    def _prune(self) -> None:
+        segments = sorted(
+            self.log_dir.glob("cert_logs_*.jsonl.gz"),
+            key=lambda p: (log_day(p.name), int(p.name.split(".")[1])),
+        )
+        total = sum(p.stat().st_size for p in segments)
+        pruned = False
+        for path in segments:
+            if total <= self.max_total_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
+            pruned = True
+        if pruned:
+            # Certificates of days with no log left go from the store and the
+            # example index too.
+            days = [log_day(p.name) for p in self.log_dir.glob("cert_logs_*.jsonl*")]
+            if days:
+                before = min(days)[len("cert_logs_"):]
+                self.store.prune(before)
+                index = get_example_index(self.log_dir)
+                if index is not None:
+                    try:
+                        index.prune(before)
+                    except Exception:
+                        logger.exception("Could not prune the certificate example index")
+
+
+_writers: dict[Path, CertificateLogWriter] = {}
+
+
+def get_log_writer(log_dir: str | os.PathLike = "logs") -> CertificateLogWriter:
+    """Return the shared writer for ``log_dir``."""
+    key = Path(log_dir).resolve()
+    writer = _writers.get(key)
+    if writer is None:
+        writer = _writers[key] = CertificateLogWriter(log_dir)
+    return writer
+
+
+@atexit.register
+def _flush_all() -> None:
+    for writer in list(_writers.values()):
+        writer.flush()
@@ -0,0 +1,84 @@
+"""Google Vision OCR with a disk-backed result cache.
+
+Results are keyed by a digest of the normalized PNG bytes sent to Vision, so
+re-uploads and retries of the same image skip the network round trip.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageOps
+
+from .cache import DEFAULT_CACHE_DIR, PersistentCache
+
+VISION_URL = "https://vision.googleapis.com/v1/images:annotate"
+VISION_FEATURE = "DOCUMENT_TEXT_DETECTION"
+
+# Concurrent Vision requests per document; keep within the project's API quota
+OCR_MAX_WORKERS = int(os.getenv("CERTCREATE_OCR_WORKERS", "8"))
+
+ocr_cache = PersistentCache(
+    os.path.join(DEFAULT_CACHE_DIR, "ocr_results.sqlite3"),
+    max_bytes=32 * 1024 * 1024,
+    max_age=7 * 24 * 3600,
+)
+
+
+def normalize_image(image: Image.Image) -> bytes:
+    """Return PNG bytes for ``image`` with its EXIF orientation applied."""
+    img = ImageOps.exif_transpose(image)
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def image_digest(image_bytes: bytes) -> str:
+    """Return the cache key for normalized image bytes."""
+    return PersistentCache.make_key(VISION_FEATURE, hashlib.sha256(image_bytes).hexdigest())
+
+
+def ocr_image_bytes(image_bytes: bytes, key: str) -> str:
+    """Return OCR text for image bytes, consulting ``ocr_cache`` first.
+
+    Raises:
+        requests.HTTPError: If the Vision API rejects the request.
+    """
+    digest = image_digest(image_bytes)
+    cached = ocr_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    payload = {
+        "requests": [
+            {
+                "image": {"content": base64.b64encode(image_bytes).decode()},
+                "features": [{"type": VISION_FEATURE}],
+            }
+        ]
+    }
+    resp = requests.post(
+        VISION_URL,
+        params={"key": key},
+        json=payload,
+        timeout=30,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    text = data["responses"][0].get("fullTextAnnotation", {}).get("text", "")
+    ocr_cache.set(digest, text)
+    return text
+
+
+def vision_ocr_image(image_bytes: bytes, key: str | None) -> str:
+    """Return OCR text from image bytes using Google Vision API."""
+    if not key:
+        return ""
+    try:
+        return ocr_image_bytes(image_bytes, key)
+    except Exception:
+        return ""
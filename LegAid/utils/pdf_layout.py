@@ -0,0 +1,88 @@
+"""Cached text measurement and line breaking for the PDF renderer.
+
+Word widths are kept in integer font units (1/1000 em) per font, so a line's
+width is ``units * 0.001 * size``, which is exactly what ReportLab's
+``stringWidth`` computes for the standard Type 1 fonts. Line breaks are
+memoized on the full text, so uniform-wording batches wrap each paragraph once.
+``fit_font_size`` builds on both to size text to its box, and is memoized too,
+so sizing every certificate on every rerun costs a dictionary lookup.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from reportlab.pdfbase import pdfmetrics
+
+
+@lru_cache(maxsize=65536)
+def word_units(word: str, font_name: str) -> int:
+    """Return the width of ``word`` in 1/1000 em units for ``font_name``."""
+    return round(pdfmetrics.stringWidth(word, font_name, 1000))
+
+
+@lru_cache(maxsize=4096)
+def wrap_text(text: str, font_name: str, font_size: float, max_width: float) -> tuple[str, ...]:
+    """Return ``text`` greedily broken into lines no wider than ``max_width``.
+
+    Explicit newlines start a new line. A single word wider than
+    ``max_width`` is kept on its own line rather than split.
+    """
+    space = word_units(" ", font_name)
+    lines = []
+    for raw in text.split("\n"):
+        current = ""
+        current_units = 0
+        for word in raw.split():
+            units = word_units(word, font_name)
+            test_units = current_units + space + units if current else units
+            if test_units * 0.001 * font_size <= max_width:
+                current = f"{current} {word}" if current else word
+                current_units = test_units
+            else:
+                if current:
+                    lines.append(current)
+                current = word
+                current_units = units
+        if current:
+            lines.append(current)
+    return tuple(lines)
+
+
+def fits(text: str, font_name: str, font_size: float, max_width: float, max_lines: int) -> bool:
+    """Return whether ``text`` wraps into ``max_lines`` lines of ``max_width``."""
+    lines = wrap_text(text, font_name, font_size, max_width)
+    if len(lines) > max_lines:
+        return False
+    # wrap_text keeps an overlong word on its own line, so check every width.
+    space = word_units(" ", font_name)
+    for line in lines:
+        words = line.split()
+        units = sum(word_units(word, font_name) for word in words) + space * (len(words) - 1)
+        if units * 0.001 * font_size > max_width:
+            return False
+    return True
+
+
+@lru_cache(maxsize=16384)
+def fit_font_size(
+    text: str,
+    font_name: str,
+    max_width: float,
+    min_size: int,
+    max_size: int,
+    max_lines: int = 1,
+) -> int:
+    """Return the largest whole size in ``[min_size, max_size]`` at which ``text`` fits.
+
+    Sizes are binary searched, since a size that fits means every smaller one
+    does. Text that does not fit even at ``min_size`` gets ``min_size``.
+    """
+    low, high = min_size, max_size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if fits(text, font_name, mid, max_width, max_lines):
+            low = mid
+        else:
+            high = mid - 1
+    return low
@@ -0,0 +1,202 @@
+"""Find certificates in a batch that likely name the same recipient.
+
+Requests assembled from several files or extraction chunks often list one
+honoree more than once, written differently ("Dr. Maria Lopez", "Maria Lopez,
+PhD"). Names are reduced to their tokens without honorifics or degrees, and
+compared by the Jaccard similarity of their character trigrams. Candidate
+pairs come from a prefix-filtered inverted index over the trigrams, rarest
+first, so a batch is not compared pairwise: two names can only reach
+``NAME_SIMILARITY`` if they share one of the first few rare trigrams of each.
+
+Matches are proposals. ``flag_possible_duplicates`` marks the later rows of
+each group the same way ``possible_split`` marks rows to split, and
+``merge_duplicate`` folds a confirmed duplicate into the row it repeats.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+
+# Minimum trigram Jaccard similarity of two normalized names
+NAME_SIMILARITY = 0.75
+# Minimum trigram Jaccard similarity of two organizations, when both are given
+ORG_SIMILARITY = 0.5
+
+HONORIFICS = frozenset(
+    {
+        "dr", "mr", "mrs", "ms", "miss", "mx", "hon", "honorable", "rev", "reverend",
+        "fr", "pastor", "prof", "professor", "sen", "senator", "rep", "mayor",
+        "councilmember", "supervisor", "judge", "chief", "sgt", "officer", "capt", "lt",
+    }
+)
+DEGREES = frozenset(
+    {
+        "esq", "phd", "md", "dds", "do", "rn", "jd", "mba", "cpa", "edd", "psyd",
+        "lcsw", "mft", "ret",
+    }
+)
+# Generational suffixes tell a father from a son, so names that differ in
+# them never match.
+GENERATIONS = {
+    "jr": "jr", "junior": "jr", "sr": "sr", "senior": "sr",
+    "ii": "ii", "2nd": "ii", "iii": "iii", "3rd": "iii", "iv": "iv", "4th": "iv",
+}
+_ORG_STOPWORDS = frozenset({"the", "of", "and", "inc", "llc", "co", "corp"})
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def name_parts(name: str) -> tuple[list[str], str]:
+    """Return the identifying tokens of ``name`` and its generational suffix.
+
+    Leading honorifics are dropped. Degrees and generational suffixes are
+    only recognized after a comma or at the end of the name, and a trailing
+    degree only while two other tokens remain, so a surname such as "Do"
+    is kept.
+    """
+    head, *rest = name.lower().replace(".", "").split(",")
+    tokens = _TOKEN_RE.findall(head)
+    while len(tokens) > 1 and tokens[0] in HONORIFICS:
+        tokens.pop(0)
+    generation = ""
+    for token in _TOKEN_RE.findall(" ".join(rest)):
+        if token in GENERATIONS:
+            generation = GENERATIONS[token]
+        elif token not in DEGREES:
+            tokens.append(token)  # "Lopez, Maria"
+    while True:
+        if len(tokens) > 1 and tokens[-1] in GENERATIONS:
+            generation = GENERATIONS[tokens.pop()]
+        elif len(tokens) > 2 and tokens[-1] in DEGREES:
+            tokens.pop()
+        else:
+            break
+    return tokens, generation
+
+
+def name_tokens(name: str) -> list[str]:
+    """Return the lowercase tokens of ``name`` without titles or degrees."""
+    return name_parts(name)[0]
+
+
+def _org_tokens(org: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(org.lower()) if t not in _ORG_STOPWORDS]
+
+
+def _trigrams(tokens) -> frozenset[str]:
+    # Sorted tokens make "Lopez, Maria" and "Maria Lopez" identical.
+    text = f" {' '.join(sorted(tokens))} "
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _orgs_match(a: frozenset, b: frozenset) -> bool:
+    return not a or not b or _jaccard(a, b) >= ORG_SIMILARITY
+
+
+def duplicate_groups(rows, name_field="Name", org_field="Organization") -> list[list[int]]:
+    """Return the indices of rows that likely name the same recipient.
+
+    Each group lists at least two indices in ascending order, and groups are
+    ordered by their first index. Rows match when their names reach
+    ``NAME_SIMILARITY``, their generational suffixes are the same, and their
+    organizations are compatible: equal enough, or missing on one side.
+    """
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    # Rows with the same normalized name and organization are merged up
+    # front, so only distinct records go through the index.
+    records = {}
+    for idx, row in enumerate(rows):
+        tokens, generation = name_parts(str(row.get(name_field) or ""))
+        if not tokens:
+            continue
+        org = tuple(_org_tokens(str(row.get(org_field) or "")))
+        key = (tuple(sorted(tokens)), org, generation)
+        if key in records:
+            union(records[key][0], idx)
+        else:
+            records[key] = (idx, _trigrams(tokens), _trigrams(org) if org else frozenset(), generation)
+
+    records = sorted(records.values(), key=lambda record: len(record[1]))
+    frequency = Counter(gram for _, grams, _, _ in records for gram in grams)
+    index = defaultdict(list)
+    for pos, (idx, grams, org, generation) in enumerate(records):
+        ordered = sorted(grams, key=lambda gram: (frequency[gram], gram))
+        prefix = ordered[: len(ordered) - math.ceil(NAME_SIMILARITY * len(ordered)) + 1]
+        candidates = set()
+        for gram in prefix:
+            candidates.update(index[gram])
+            index[gram].append(pos)
+        for other in candidates:
+            other_idx, other_grams, other_org, other_generation = records[other]
+            # Records are visited shortest first, so this bounds the ratio.
+            if generation != other_generation or len(other_grams) < NAME_SIMILARITY * len(grams):
+                continue
+            if _jaccard(grams, other_grams) >= NAME_SIMILARITY and _orgs_match(org, other_org):
+                union(idx, other_idx)
+
+    groups = defaultdict(list)
+    for idx in range(len(rows)):
+        groups[find(idx)].append(idx)
+    return [group for _, group in sorted(groups.items()) if len(group) > 1]
+
+
+def flag_possible_duplicates(rows) -> int:
+    """Mark rows that repeat an earlier recipient and return how many.
+
+    The later rows of each group get ``possible_duplicate`` set and the name
+    they repeat in ``alternatives["duplicate_of"]``. Flags from a previous
+    call are cleared first.
+    """
+    for row in rows:
+        if row.pop("possible_duplicate", False):
+            row["alternatives"] = {
+                k: v for k, v in (row.get("alternatives") or {}).items() if k != "duplicate_of"
+            }
+    flagged = 0
+    for group in duplicate_groups(rows):
+        first = rows[group[0]]
+        for idx in group[1:]:
+            row = rows[idx]
+            row["possible_duplicate"] = True
+            row["alternatives"] = {**(row.get("alternatives") or {}), "duplicate_of": first["Name"]}
+            flagged += 1
+    return flagged
+
+
+def merge_duplicate(rows, index) -> list:
+    """Return ``rows`` with row ``index`` folded into the row it repeats.
+
+    Blank fields of the earlier row are filled from the duplicate, which is
+    then dropped. The remaining rows are flagged again.
+    """
+    rows = list(rows)
+    group = next((g for g in duplicate_groups(rows) if index in g[1:]), None)
+    if group is None:
+        rows[index] = {**rows[index], "possible_duplicate": False}
+        return rows
+    keep = dict(rows[group[0]])
+    for field, value in rows[index].items():
+        if isinstance(value, str) and value.strip() and not str(keep.get(field) or "").strip():
+            keep[field] = value
+    rows[group[0]] = keep
+    del rows[index]
+    flag_possible_duplicates(rows)
+    return rows
@@ -0,0 +1,135 @@
+"""Per-certificate render cache for CertCreate.
+
+Pages are keyed by a hash of the fields that affect how a certificate looks,
+so a rerun after editing one certificate re-renders only that page and the
+final documents are assembled from cached pages.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from difflib import SequenceMatcher
+from io import BytesIO
+
+import fitz  # PyMuPDF
+
+from .cache import PersistentCache
+from .cert_engine import (
+    assemble_word_document,
+    generate_pdf_certificates,
+    word_page_fragment,
+)
+
+RENDER_FIELDS = (
+    "Name",
+    "Title",
+    "Organization",
+    "Certificate_Text",
+    "Formatted_Date",
+    "Name_Size",
+    "Title_Size",
+    "Text_Size",
+    "Date_Size",
+)
+
+
+def render_key(entry: dict) -> str:
+    """Return the cache key for the render-relevant fields of ``entry``."""
+    return PersistentCache.make_key(*(entry.get(field) for field in RENDER_FIELDS))
+
+
+def batch_key(entries) -> str:
+    """Return a key identifying an ordered set of certificates as rendered."""
+    return PersistentCache.make_key(*(render_key(entry) for entry in entries))
+
+
+class CertificateRenderCache:
+    """Keep rendered pages and exports between Streamlit reruns.
+
+    Word pages are stored as XML fragments in an LRU of ``max_pages``. The
+    PDF is kept open in PyMuPDF together with the key of each page, and only
+    pages whose keys changed are re-rendered and spliced in. Finished exports
+    are memoized until the approved set changes.
+    """
+
+    def __init__(self, max_pages: int = 1000):
+        self.max_pages = max_pages
+        self.pages_rendered = 0
+        self._word_pages: OrderedDict[str, list] = OrderedDict()
+        self._pdf = None
+        self._pdf_keys: list[str] = []
+        self._exports: dict[str, tuple[str, bytes, float]] = {}
+
+    def _word_page(self, entry: dict) -> list:
+        key = render_key(entry)
+        fragment = self._word_pages.get(key)
+        if fragment is None:
+            fragment = word_page_fragment(entry)
+            self.pages_rendered += 1
+            self._word_pages[key] = fragment
+            while len(self._word_pages) > self.max_pages:
+                self._word_pages.popitem(last=False)
+        else:
+            self._word_pages.move_to_end(key)
+        return [deepcopy(p) for p in fragment]
+
+    def word_document(self, entries):
+        """Return a Word document for ``entries`` built from cached pages."""
+        return assemble_word_document([self._word_page(entry) for entry in entries])
+
+    def docx_bytes(self, entries) -> bytes:
+        """Return the Word document for ``entries`` as bytes."""
+        buffer = BytesIO()
+        self.word_document(entries).save(buffer)
+        return buffer.getvalue()
+
+    def cached_export(self, fmt: str, entries):
+        """Return ``(data, seconds)`` for a finished export of ``entries`` or ``None``."""
+        export = self._exports.get(fmt)
+        if export is None or export[0] != batch_key(entries):
+            return None
+        return export[1], export[2]
+
+    def export(self, fmt: str, entries):
+        """Render ``entries`` as ``"docx"`` or ``"pdf"`` and return ``(data, seconds)``.
+
+        The result is memoized, so repeated calls for an unchanged set of
+        certificates return the same bytes without rendering.
+        """
+        cached = self.cached_export(fmt, entries)
+        if cached is not None:
+            return cached
+        render = {"docx": self.docx_bytes, "pdf": self.pdf_bytes}[fmt]
+        start = time.perf_counter()
+        data = render(entries)
+        elapsed = time.perf_counter() - start
+        self._exports[fmt] = (batch_key(entries), data, elapsed)
+        return data, elapsed
+
+    def pdf_bytes(self, entries) -> bytes:
+        """Return PDF bytes for ``entries``, re-rendering only changed pages."""
+        entries = list(entries)
+        keys = [render_key(entry) for entry in entries]
+        if not entries:
+            return generate_pdf_certificates(entries)
+
+        if self._pdf is None:
+            self._pdf = fitz.open(stream=generate_pdf_certificates(entries), filetype="pdf")
+            self.pages_rendered += len(entries)
+        else:
+            matcher = SequenceMatcher(a=self._pdf_keys, b=keys, autojunk=False)
+            # Apply edits back to front so earlier page indexes stay valid.
+            for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+                if tag == "equal":
+                    continue
+                if i2 > i1:
+                    self._pdf.delete_pages(from_page=i1, to_page=i2 - 1)
+                if j2 > j1:
+                    part = generate_pdf_certificates(entries[j1:j2])
+                    with fitz.open(stream=part, filetype="pdf") as pages:
+                        self._pdf.insert_pdf(pages, start_at=i1)
+                    self.pages_rendered += j2 - j1
+        self._pdf_keys = keys
+        return self._pdf.tobytes(garbage=1, deflate=True)
@@ -0,0 +1,51 @@
+"""Paging and search for the CertCreate review list.
+
+Only one page of certificates is drawn per rerun, so the cost of redrawing
+the review section depends on the page size rather than the batch size.
+"""
+
+from __future__ import annotations
+
+REVIEW_PAGE_SIZE = 20
+SEARCH_FIELDS = ("Name", "Title", "Organization", "Certificate_Text")
+
+
+def page_count(total: int, page_size: int = REVIEW_PAGE_SIZE) -> int:
+    """Return the number of review pages for ``total`` certificates (at least 1)."""
+    return max(1, -(-total // page_size))
+
+
+def page_of(index: int, page_size: int = REVIEW_PAGE_SIZE) -> int:
+    """Return the 1-based page showing the certificate at 0-based ``index``."""
+    return index // page_size + 1
+
+
+def page_bounds(total: int, page: int, page_size: int = REVIEW_PAGE_SIZE) -> tuple[int, int]:
+    """Return the ``(start, stop)`` slice of the certificates on ``page``.
+
+    Pages past the end show the last page.
+    """
+    page = min(max(page, 1), page_count(total, page_size))
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def find_certificates(rows, query: str, limit: int = 50) -> list[int]:
+    """Return the indices of up to ``limit`` rows containing ``query``.
+
+    The match is case-insensitive over the name, title, organization and
+    certificate text; rows whose name matches come first.
+    """
+    query = query.strip().casefold()
+    if not query:
+        return []
+    by_name = []
+    by_other = []
+    for idx, row in enumerate(rows):
+        if query in str(row.get("Name") or "").casefold():
+            by_name.append(idx)
+        elif any(query in str(row.get(field) or "").casefold() for field in SEARCH_FIELDS[1:]):
+            by_other.append(idx)
+        if len(by_name) >= limit:
+            break
+    return (by_name + by_other)[:limit]
@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import json
 import re
-from datetime import datetime
-from dateutil import parser as date_parser
+
+from .dates import DATE_STRING_RE, parse_date
 
 
 def example_helper():
@@ -44,25 +44,103 @@ def extract_json_block(content: str) -> str:
                 lower = text.lower()
                 break
 
-    decoder = json.JSONDecoder()
-    saw_candidate = False
-
-    for match in re.finditer(r"[\[{]", text):
-        candidate_start = match.start()
+    first = _JSON_OPEN_RE.search(text)
+    if first is None:
+        raise ValueError("No JSON object or array found in response.")
+
+    # Usually the first bracket starts the payload, so try it before scanning.
+    too_deep = False
+    try:
+        snippet = _decode_block(text[first.start():])
+    except RecursionError:
+        snippet, too_deep = None, True
+    if snippet:
+        return snippet
+
+    ends: dict[int, int] = {}
+    failed: set[int] = set()
+    skip_until = first.start() + 1
+    if too_deep:
+        _scan_block(text, first.start(), ends, failed)
+        skip_until = ends.get(first.start(), skip_until)
+    for candidate in _JSON_CANDIDATE_RE.finditer(text, first.start()):
+        start = candidate.start()
+        if start < skip_until:
+            continue
+        if start not in ends and start not in failed:
+            _scan_block(text, start, ends, failed)
+        if start in failed:
+            continue
         try:
-            _, end = decoder.raw_decode(text[candidate_start:])
-        except json.JSONDecodeError:
-            saw_candidate = True
+            snippet = _decode_block(text[start:ends[start]])
+        except RecursionError:
+            # Blocks nested inside one this deep would only fail the same way.
+            skip_until = ends[start]
             continue
-
-        snippet = text[candidate_start : candidate_start + end].strip()
         if snippet:
             return snippet
 
-    if saw_candidate:
-        raise ValueError("JSON content appears to be truncated in the response.")
+    raise ValueError("JSON content appears to be truncated in the response.")
+
 
-    raise ValueError("No JSON object or array found in response.")
+_JSON_DECODER = json.JSONDecoder()
+_JSON_OPEN_RE = re.compile(r"[\[{]+")
+# Runs of opening brackets, one closing bracket, a whole JSON string, or the
+# quote of a string that never ends
+_JSON_TOKEN_RE = re.compile(r'[\[{]+|[\]}]|"[^"\\]*(?:\\.[^"\\]*)*"|"', re.DOTALL)
+_JSON_OPENERS = {"}": "{", "]": "["}
+# What can follow an opening bracket in valid JSON; checked before decoding
+_JSON_START_RE = re.compile(r'\{\s*["}]|\[\s*(?:[-\d"\[\]{]|true|false|null)')
+# Every position where a JSON block could start, found without a Python loop
+_JSON_CANDIDATE_RE = re.compile(f"(?={_JSON_START_RE.pattern})")
+
+
+def _decode_block(block: str) -> str | None:
+    """Return the JSON value at the start of ``block``, or ``None``.
+
+    Only the block is decoded, so a failure costs no more than the block
+    itself; errors on the full text would count lines from its start.
+    """
+    if not _JSON_START_RE.match(block):
+        return None
+    try:
+        _, end = _JSON_DECODER.raw_decode(block)
+    except json.JSONDecodeError:
+        return None
+    return block[:end].strip()
+
+
+def _scan_block(text: str, start: int, ends: dict[int, int], failed: set[int]) -> None:
+    """Find where the block opened at ``start`` closes, reading from ``start``.
+
+    Brackets inside JSON strings are skipped, with strings delimited as a
+    decoder starting at ``start`` would see them. Every bracket opened outside
+    a string on the way is read the same way from its own position, so its
+    end goes into ``ends`` too, or it goes into ``failed`` when an unmatched
+    closer, an unterminated string or the end of the text leaves it open.
+    Later candidates are then resolved without scanning again; only brackets
+    that sat inside a string here need a scan of their own.
+    """
+    stack: list[int] = []
+    pos = start
+    while True:
+        match = _JSON_TOKEN_RE.search(text, pos)
+        if match is None:
+            break
+        token_start, pos = match.span()
+        char = text[token_start]
+        if char == "{" or char == "[":
+            stack.extend(range(token_start, pos))
+        elif char == '"':
+            if pos - token_start == 1:
+                break  # an unterminated string swallows the rest of the text
+        elif text[stack[-1]] == _JSON_OPENERS[char]:
+            ends[stack.pop()] = pos
+            if not stack:
+                return
+        else:
+            break  # a mismatched closer ends every open block
+    failed.update(stack)
 
 
 def normalize_date_strings(text: str) -> str:
@@ -73,30 +151,15 @@ def normalize_date_strings(text: str) -> str:
     ``YYYY-MM-DD``.
     """
 
-    month = (
-        r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|"
-        r"May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|"
-        r"Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
-    )
-
-    patterns = [
-        rf"{month}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{2,4}})?(?:\s+[A-Za-z]+)*",
-        r"\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?",
-        rf"\d{{1,2}}(?:st|nd|rd|th)?\s+of\s+{month}\.?(?:,?\s*\d{{2,4}})?",
-        r"\d{4}-\d{2}-\d{2}",
-    ]
-    date_regex = re.compile("|".join(patterns), flags=re.IGNORECASE)
-
     def repl(match: re.Match) -> str:
         raw = match.group(0)
-        try:
-            dt = date_parser.parse(raw, fuzzy=True, default=datetime(1900, 1, 1))
-        except Exception:
+        dt = parse_date(raw)
+        if dt is None:
             return raw
         has_year = dt.year != 1900
         return dt.strftime("%Y-%m-%d") if has_year else dt.strftime("%B %d")
 
-    return date_regex.sub(repl, text)
+    return DATE_STRING_RE.sub(repl, text)
 
 
 def reset_certcreate_session():
@@ -114,6 +177,8 @@ def reset_certcreate_session():
         "use_uniform",
         "guidance",
         "manual_certs",
+        "render_cache",
+        "log_session",
     ]
     for k in keys:
         if k in st.session_state:
@@ -122,19 +187,67 @@ def reset_certcreate_session():
     st.session_state.start_mode = None
 
 
+FIRST_PERSON_REPLACEMENTS = {
+    "we are": "I am",
+    "we're": "I'm",
+    "we have": "I have",
+    "we've": "I've",
+    "we": "I",
+    "our": "my",
+    "ours": "mine",
+}
+_FIRST_PERSON_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(k) for k in sorted(FIRST_PERSON_REPLACEMENTS, key=len, reverse=True))
+    + r")\b",
+    flags=re.IGNORECASE,
+)
+# Replacements for the usual lower, capitalized and upper case spellings
+_FIRST_PERSON_FORMS = {
+    form: repl
+    for word, replacement in FIRST_PERSON_REPLACEMENTS.items()
+    for form, repl in (
+        (word, replacement),
+        (word[0].upper() + word[1:], replacement[0].upper() + replacement[1:]),
+        (word.upper(), replacement.upper()),
+    )
+}
+# Joins batched texts; it is not a word character, so ``\b`` still holds at the edges.
+_BATCH_SEPARATOR = "\x00"
+
+
+def _first_person_repl(match: re.Match) -> str:
+    word = match.group(0)
+    repl = _FIRST_PERSON_FORMS.get(word)
+    if repl is not None:
+        return repl
+    repl = FIRST_PERSON_REPLACEMENTS[word.lower()]
+    if word.isupper():
+        return repl.upper()
+    if word[0].isupper():
+        return repl[0].upper() + repl[1:]
+    return repl
+
+
 def enforce_first_person(text: str) -> str:
-    """Return text with first-person pronouns instead of plural forms."""
-
-    replacements = [
-        (r"\bwe are\b", "I am"),
-        (r"\bwe're\b", "I'm"),
-        (r"\bwe have\b", "I have"),
-        (r"\bwe've\b", "I've"),
-        (r"\bwe\b", "I"),
-        (r"\bour\b", "my"),
-        (r"\bours\b", "mine"),
-    ]
+    """Return text with first-person pronouns instead of plural forms.
+
+    The capitalization of each replaced phrase is kept, so "Our" becomes
+    "My" and "WE ARE" becomes "I AM".
+    """
+
+    return _FIRST_PERSON_RE.sub(_first_person_repl, text)
+
+
+def enforce_first_person_many(texts: list[str]) -> list[str]:
+    """Return :func:`enforce_first_person` applied to every string in ``texts``.
+
+    The texts are rewritten in one regex pass over their joined contents.
+    """
 
-    for pattern, repl in replacements:
-        text = re.sub(pattern, repl, text, flags=re.IGNORECASE)
-    return text
+    texts = list(texts)
+    if not texts:
+        return []
+    if any(_BATCH_SEPARATOR in t for t in texts):
+        return [enforce_first_person(t) for t in texts]
+    return enforce_first_person(_BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
@@ -0,0 +1,95 @@
+"""Benchmark date normalization over long OCR texts.
+
+Compares the original ``normalize_date_strings`` (pattern compiled and every
+match fuzzily parsed on each call) with the precompiled, memoized version in
+``LegAid.utils.dates``, and times repeated ``extract_event_date`` calls as
+made on each CertCreate rerun.
+
+    python benchmarks/bench_dates.py --pages 50 --runs 5
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dateutil import parser as date_parser
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.cert_engine import _extract_event_date, extract_event_date
+from LegAid.utils.dates import parse_date
+from LegAid.utils.shared_functions import normalize_date_strings
+
+DATES = [
+    "June 14th", "JUNE 14TH, 2025", "14th of June", "6/14/2025", "2025-06-14",
+    "Sept. 3 Reception", "12-1-24", "May 31, 2024", "March 8",
+]
+FILLER = (
+    "Please join the Kern County Chamber of Commerce for its annual awards "
+    "luncheon honoring local business leaders and community volunteers. "
+)
+
+
+def legacy_normalize(text):
+    month = (
+        r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|"
+        r"May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|"
+        r"Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+    )
+    patterns = [
+        rf"{month}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{2,4}})?(?:\s+[A-Za-z]+)*",
+        r"\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?",
+        rf"\d{{1,2}}(?:st|nd|rd|th)?\s+of\s+{month}\.?(?:,?\s*\d{{2,4}})?",
+        r"\d{4}-\d{2}-\d{2}",
+    ]
+    date_regex = re.compile("|".join(patterns), flags=re.IGNORECASE)
+
+    def repl(match):
+        raw = match.group(0)
+        try:
+            dt = date_parser.parse(raw, fuzzy=True, default=datetime(1900, 1, 1))
+        except Exception:
+            return raw
+        return dt.strftime("%Y-%m-%d") if dt.year != 1900 else dt.strftime("%B %d")
+
+    return date_regex.sub(repl, text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5, help="reruns over the same text")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Roughly 40 date mentions per 3,000-character page
+    text = " ".join(
+        f"{FILLER}{rng.choice(DATES)}." for _ in range(args.pages * 40)
+    )
+    undated = FILLER * (args.pages * 20)
+    print(f"text         {len(text):,} chars, {args.runs} runs")
+
+    results = {}
+    for label, normalize in (("fuzzy", legacy_normalize), ("memoized", normalize_date_strings)):
+        parse_date.cache_clear()
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            output = normalize(text)
+        results[label] = (time.perf_counter() - start, output)
+        print(f"{label:<12} normalize {results[label][0] * 1000:.1f} ms")
+    assert results["fuzzy"][1] == results["memoized"][1]
+    print(f"speedup      {results['fuzzy'][0] / results['memoized'][0]:.1f}x")
+
+    _extract_event_date.cache_clear()
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        extract_event_date(undated)
+    print(f"extract_event_date on {len(undated):,} undated chars: {(time.perf_counter() - start) * 1000:.1f} ms for {args.runs} reruns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark Word certificate generation.
+
+Compares building every page through the python-docx API with cloning the
+cached prototype page used by ``generate_word_certificates``.
+
+    python benchmarks/bench_docx_render.py --count 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.cert_engine import (
+    _add_certificate_page,
+    _add_page_break,
+    _add_signature_block,
+    _new_word_document,
+    generate_word_certificates,
+)
+
+TEXT = (
+    "On behalf of the California State Legislature, congratulations on your "
+    "exemplary service as President with the Bakersfield Rotary Club. Your "
+    "steadfast commitment to our community sets a standard for others."
+)
+
+
+def build_page_by_page(entries):
+    doc = _new_word_document()
+    for i, entry in enumerate(entries):
+        if i > 0:
+            _add_page_break(doc)
+        _add_certificate_page(doc, entry)
+    _add_signature_block(doc)
+    return doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    entries = [
+        {
+            "Name": f"Recipient {i}",
+            "Title": "President" if i % 2 else "",
+            "Organization": "Bakersfield Rotary Club",
+            "Certificate_Text": TEXT,
+            "Formatted_Date": "Dated the 14th of June\nTwo Thousand and Twenty-Five",
+        }
+        for i in range(args.count)
+    ]
+
+    results = {}
+    for label, build in (("python-docx", build_page_by_page), ("cloned", generate_word_certificates)):
+        start = time.perf_counter()
+        build(entries)
+        results[label] = time.perf_counter() - start
+        print(f"{label:<12} {args.count} pages in {results[label]:.2f}s  ({args.count / results[label]:,.0f} pages/s)")
+    print(f"speedup      {results['python-docx'] / results['cloned']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
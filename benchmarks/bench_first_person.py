@@ -0,0 +1,71 @@
+"""Benchmark the first-person pronoun rewriter.
+
+Compares the original seven sequential ``re.sub`` calls per text with the
+single compiled pass of ``enforce_first_person`` and the batched
+``enforce_first_person_many``.
+
+    python benchmarks/bench_first_person.py --count 10000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.shared_functions import enforce_first_person, enforce_first_person_many
+
+SENTENCES = [
+    "On behalf of the California State Legislature, we are proud to honor your service.",
+    "Our community is stronger because of your dedication and leadership.",
+    "We've watched your organization grow, and we have been inspired by it.",
+    "Your commitment sets a standard for others to follow.",
+    "We're grateful for everything you have given to ours and neighboring cities.",
+    "Congratulations on this well deserved recognition.",
+]
+
+
+def sequential(text):
+    replacements = [
+        (r"\bwe are\b", "I am"),
+        (r"\bwe're\b", "I'm"),
+        (r"\bwe have\b", "I have"),
+        (r"\bwe've\b", "I've"),
+        (r"\bwe\b", "I"),
+        (r"\bour\b", "my"),
+        (r"\bours\b", "mine"),
+    ]
+    for pattern, repl in replacements:
+        text = re.sub(pattern, repl, text, flags=re.IGNORECASE)
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [" ".join(rng.sample(SENTENCES, 3)) for _ in range(args.count)]
+
+    runs = (
+        ("sequential", lambda: [sequential(t) for t in texts]),
+        ("compiled", lambda: [enforce_first_person(t) for t in texts]),
+        ("batched", lambda: enforce_first_person_many(texts)),
+    )
+    results = {}
+    for label, run in runs:
+        start = time.perf_counter()
+        output = run()
+        results[label] = (time.perf_counter() - start, output)
+        print(f"{label:<12} {args.count} texts in {results[label][0] * 1000:.1f} ms")
+    assert results["compiled"][1] == results["batched"][1]
+    for label in ("compiled", "batched"):
+        print(f"{label:<12} {results['sequential'][0] / results[label][0]:.1f}x faster than sequential")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark JSON extraction from LLM replies on worst-case inputs.
+
+Times ``extract_json_block`` on replies that made the original
+decode-from-every-bracket loop quadratic: long runs of unclosed brackets,
+deep nesting, many invalid blocks, and one very large valid reply.
+
+    python benchmarks/bench_json_extract.py --scale 1.0
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.shared_functions import extract_json_block
+
+
+def cases(scale):
+    payload = {
+        "certificates": [
+            {"name": f"Recipient {i}", "commendation": "x" * 200} for i in range(int(20_000 * scale))
+        ]
+    }
+    return (
+        ("unclosed", "{" * int(2_000_000 * scale) + ' {"ok": 1}'),
+        ("nested", "[" * int(500_000 * scale) + "]" * int(500_000 * scale) + ' {"ok": 1}'),
+        ("invalid", "{not json} [nor, this] " * int(100_000 * scale) + '{"ok": 1}'),
+        ("large", "Here are the certificates:\n" + json.dumps(payload) + "\nLet me know!"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for label, content in cases(args.scale):
+        start = time.perf_counter()
+        extract_json_block(content)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {len(content):>10,} chars in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark PDF certificate rendering throughput.
+
+Renders a batch of uniform-wording certificates and reports pages/sec, then
+times the line-wrapping step alone against the original per-prefix
+``stringWidth`` approach.
+
+    python benchmarks/bench_pdf_render.py --count 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from LegAid.utils.cert_engine import generate_pdf_certificates
+from LegAid.utils.pdf_layout import wrap_text
+
+TEXT = (
+    "On behalf of the California State Legislature, congratulations on your "
+    "exemplary service as President with the Bakersfield Rotary Club. Your "
+    "steadfast commitment to our community sets a standard for others. "
+    "May this celebration bring continued success and joy. Wish you the best."
+)
+AVAIL_WIDTH = 468.0
+
+
+def naive_wrap(text, font_name, font_size, max_width):
+    """The wrapper the renderer used before pdf_layout existed."""
+    lines = []
+    for raw in text.split("\n"):
+        current = ""
+        for word in raw.split():
+            test = f"{current} {word}".strip()
+            if stringWidth(test, font_name, font_size) <= max_width:
+                current = test
+            else:
+                if current:
+                    lines.append(current)
+                current = word
+        if current:
+            lines.append(current)
+    return lines
+
+
+def make_entries(count):
+    return [
+        {
+            "Name": f"Recipient {i}",
+            "Title": "President",
+            "Organization": "Bakersfield Rotary Club",
+            "Certificate_Text": TEXT,
+            "Formatted_Date": "Dated the 14th of June\nTwo Thousand and Twenty-Five",
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    entries = make_entries(args.count)
+    elapsed = timed(generate_pdf_certificates, entries)
+    print(f"render  {args.count} pages in {elapsed:.2f}s  ({args.count / elapsed:,.0f} pages/s)")
+
+    def run(wrap):
+        for _ in range(args.count):
+            wrap(TEXT, "Times-Roman", 20, AVAIL_WIDTH)
+
+    wrap_text.cache_clear()
+    naive = timed(run, naive_wrap)
+    cached = timed(run, wrap_text)
+    print(f"wrap    naive {naive * 1000:.1f}ms  cached {cached * 1000:.1f}ms  ({naive / cached:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
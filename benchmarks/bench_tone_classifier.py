@@ -0,0 +1,75 @@
+"""Benchmark commendation tone classification.
+
+Compares the original per-certificate substring scans of the lowercased event
+context with the compiled, memoized classifier used by
+``enhanced_commendation``.
+
+    python benchmarks/bench_tone_classifier.py --count 1000 --pages 20
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.cert_engine import commendation_style, context_tones
+
+PAGE = (
+    "The Kern County Chamber of Commerce invites you to its annual business "
+    "luncheon honoring local leaders who have shaped our region. Guests will "
+    "hear from the board, meet this year's honorees and enjoy a catered lunch "
+    "at the downtown convention center. "
+) * 12
+
+CATEGORIES = ["Business Leadership", "Community Service", "Grand Opening", "Retirement", "Volunteer"]
+
+
+def legacy_style(category, context):
+    context = context.lower()
+    category_lower = category.lower()
+    if (
+        any(word in context for word in ["memorial", "tribute", "in memory"]) or
+        any(word in category_lower for word in ["memorial", "tribute"])
+    ):
+        return "solemn"
+    if (
+        any(word in context for word in ["veteran", "patriotic", "flag", "military"]) or
+        any(word in category_lower for word in ["veteran", "military"])
+    ):
+        return "patriotic"
+    if (
+        any(word in context for word in ["celebration", "festival", "anniversary", "award", "gala", "recognition"]) or
+        any(word in category_lower for word in ["celebration", "anniversary", "award", "opening", "congratulation", "festival"])
+    ):
+        return "celebratory"
+    return "formal"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="certificates per request")
+    parser.add_argument("--pages", type=int, default=20, help="pages of event text")
+    args = parser.parse_args()
+
+    # A keyword-free context is the worst case: every scan reads the whole text.
+    context = PAGE * args.pages
+    rng = random.Random(0)
+    categories = [rng.choice(CATEGORIES) for _ in range(args.count)]
+    print(f"context      {len(context):,} chars, {args.count} certificates")
+
+    results = {}
+    for label, classify in (("substring", legacy_style), ("compiled", commendation_style)):
+        context_tones.cache_clear()
+        start = time.perf_counter()
+        styles = [classify(category, context) for category in categories]
+        results[label] = (time.perf_counter() - start, styles)
+        print(f"{label:<12} {results[label][0] * 1000:.1f} ms")
+    assert results["substring"][1] == results["compiled"][1]
+    print(f"speedup      {results['substring'][0] / results['compiled'][0]:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Generate certificates for a directory of request files without Streamlit.
+
+Each request is ingested, sent to GPT for extraction and rendered to a
+PDF/DOCX bundle inside a process pool. A JSONL manifest records the outcome
+of every request and per-stage throughput is printed when the run finishes.
+"""
+
+import os
+import json
+import time
+import argparse
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from LegAid.utils.cert_engine import (
+    SUPPORTED_EXTENSIONS,
+    IMAGE_EXTENSIONS,
+    read_document,
+    extract_event_date,
+    format_certificate_date,
+    extract_certificates_chunked,
+    generate_word_certificates,
+    render_pdf_sharded,
+    write_pdf_certificates,
+)
+from LegAid.utils.recipient_dedupe import duplicate_groups
+
+STAGES = ("ingest", "extract", "render")
+
+
+def bundle_names(paths):
+    """Return a distinct bundle directory name for each request path.
+
+    A bundle is named after its request file. Requests that differ only in
+    extension (``a.pdf`` and ``a.docx``) keep it in the name so neither
+    overwrites the other, and any remaining clash gets a counter. Names are
+    compared case-insensitively, as some file systems do.
+    """
+    paths = [Path(p) for p in paths]
+    stems = Counter(p.stem.casefold() for p in paths)
+    taken = set()
+    names = []
+    for path in paths:
+        name = path.stem
+        if stems[name.casefold()] > 1:
+            name = f"{name}_{path.suffix.lstrip('.').lower()}"
+        base, n = name, 2
+        while name.casefold() in taken:
+            name = f"{base}_{n}"
+            n += 1
+        taken.add(name.casefold())
+        names.append(name)
+    return names
+
+
+def process_request(
+    path,
+    output_dir,
+    formats=("pdf", "docx"),
+    uniform=False,
+    event_date=None,
+    render_workers=1,
+    bundle_name=None,
+):
+    """Run ingest, extraction and rendering for one request file.
+
+    Returns a manifest record. Failures are captured in the record so one bad
+    request does not stop the batch. With ``render_workers`` above one, large
+    PDFs are rendered in shards across that many processes. The bundle is
+    written to ``output_dir/bundle_name``, by default the request's file name
+    without its extension.
+    """
+    path = Path(path)
+    record = {
+        "request": str(path),
+        "status": "ok",
+        "certificates": 0,
+        "outputs": [],
+        "timings": {},
+    }
+    stage = "ingest"
+    try:
+        start = time.perf_counter()
+        text, source_type = read_document(path, ocr_key=os.getenv("GOOGLE_VISION_KEY"))
+        if path.suffix.lower() in IMAGE_EXTENSIONS:
+            source_type = "flyer"
+        record["source_type"] = source_type
+        record["timings"][stage] = time.perf_counter() - start
+        if not text.strip():
+            raise ValueError("No text could be extracted from the request.")
+
+        stage = "extract"
+        start = time.perf_counter()
+        event_date_raw = event_date or extract_event_date(text)
+        _, cert_rows, _ = extract_certificates_chunked(
+            text,
+            event_date_raw or datetime.today().strftime("%B %d, %Y"),
+            uniform=uniform,
+            source_type=source_type,
+        )
+        if event_date_raw:
+            formatted = format_certificate_date(event_date_raw)
+            for cert in cert_rows:
+                cert["Formatted_Date"] = formatted
+        groups = duplicate_groups(cert_rows)
+        if groups:
+            record["possible_duplicates"] = [[cert_rows[i]["Name"] for i in g] for g in groups]
+        record["certificates"] = len(cert_rows)
+        record["timings"][stage] = time.perf_counter() - start
+
+        stage = "render"
+        start = time.perf_counter()
+        bundle_dir = Path(output_dir) / (bundle_name or path.stem)
+        bundle_dir.mkdir(parents=True, exist_ok=True)
+        if cert_rows and "docx" in formats:
+            docx_path = bundle_dir / "Certificates.docx"
+            generate_word_certificates(cert_rows).save(str(docx_path))
+            record["outputs"].append(str(docx_path))
+        if cert_rows and "pdf" in formats:
+            pdf_path = bundle_dir / "Certificates.pdf"
+            if render_workers > 1:
+                render_pdf_sharded(cert_rows, workers=render_workers, output_path=pdf_path)
+            else:
+                write_pdf_certificates(cert_rows, pdf_path)
+            record["outputs"].append(str(pdf_path))
+        record["timings"][stage] = time.perf_counter() - start
+    except Exception as exc:  # noqa: BLE001
+        record["status"] = "error"
+        record["stage"] = stage
+        record["error"] = str(exc)
+    return record
+
+
+def summarize(records, wall_time, workers):
+    """Return a printable per-stage throughput report."""
+    lines = []
+    for stage in STAGES:
+        timings = [r["timings"][stage] for r in records if stage in r["timings"]]
+        busy = sum(timings)
+        rate = len(timings) / busy if busy else 0.0
+        lines.append(
+            f"{stage:<8} {len(timings):>5} requests  {busy:>9.2f}s busy  "
+            f"{rate:>7.2f} req/s per worker"
+        )
+    certs = sum(r["certificates"] for r in records)
+    failed = sum(1 for r in records if r["status"] != "ok")
+    overall = len(records) / wall_time if wall_time else 0.0
+    lines.append(
+        f"total    {len(records):>5} requests  {wall_time:>9.2f}s wall  "
+        f"{overall:>7.2f} req/s with {workers} workers "
+        f"({certs} certificates, {failed} failed)"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate certificates for every request file in a directory.")
+    parser.add_argument("input_dir", help="Directory containing request files")
+    parser.add_argument("-o", "--output-dir", default="certificates_out", help="Where bundles are written")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--render-workers", type=int, default=1, help="Processes per request for sharded PDF rendering")
+    parser.add_argument("--manifest", help="Manifest path (default: <output-dir>/manifest.jsonl)")
+    parser.add_argument("--formats", default="pdf,docx", help="Comma separated output formats")
+    parser.add_argument("--uniform", action="store_true", help="Use the same wording for every certificate")
+    parser.add_argument("--event-date", help="Override the event date for every request")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError(
+            "OPENAI_API_KEY environment variable is not set. Provide your OpenAI API key to continue."
+        )
+
+    input_dir = Path(args.input_dir)
+    if not input_dir.is_dir():
+        raise NotADirectoryError(args.input_dir)
+
+    request_files = sorted(
+        p for p in input_dir.iterdir()
+        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(args.manifest) if args.manifest else output_dir / "manifest.jsonl"
+    formats = tuple(f.strip().lower() for f in args.formats.split(",") if f.strip())
+    workers = max(1, args.workers)
+
+    records = []
+    start = time.perf_counter()
+    with manifest_path.open("w", encoding="utf-8") as manifest, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                process_request,
+                str(path),
+                str(output_dir),
+                formats,
+                args.uniform,
+                args.event_date,
+                args.render_workers,
+                name,
+            )
+            for path, name in zip(request_files, bundle_names(request_files))
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            print(f"[{record['status']}] {record['request']}", file=sys.stderr)
+    wall_time = time.perf_counter() - start
+
+    print(summarize(records, wall_time, workers), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,10 @@ import os
 import json
 import argparse
 import sys
-from PIL import Image, ImageOps
-from io import BytesIO
-import base64
-import requests
+from PIL import Image
 import openai
 
+from LegAid.utils.ocr import normalize_image, ocr_image_bytes
 from LegAid.utils.shared_functions import normalize_date_strings, extract_json_block
 
 
@@ -33,28 +31,7 @@ def ocr_image(path: str) -> str:
     if not key:
         raise RuntimeError("GOOGLE_VISION_KEY environment variable is not set.")
 
-    img = ImageOps.exif_transpose(Image.open(path))
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-
-    payload = {
-        "requests": [
-            {
-                "image": {"content": base64.b64encode(buf.getvalue()).decode()},
-                "features": [{"type": "DOCUMENT_TEXT_DETECTION"}],
-            }
-        ]
-    }
-
-    resp = requests.post(
-        "https://vision.googleapis.com/v1/images:annotate",
-        params={"key": key},
-        json=payload,
-        timeout=30,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    return data["responses"][0].get("fullTextAnnotation", {}).get("text", "")
+    return ocr_image_bytes(normalize_image(Image.open(path)), key)
 
 
 def parse_certificate(text: str) -> list:
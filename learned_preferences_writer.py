@@ -1,44 +1,166 @@
+import argparse
+import gzip
+import hashlib
 import json
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+CHECKPOINT_NAME = "learned_preferences.checkpoint.json"
+
+
 def extract_phrases(text):
     """Extract commonly used ending phrases or key lines."""
     lines = text.strip().split("\n")
     return [line.strip() for line in lines if len(line.strip()) > 10]
 
-def summarize_logs(log_dir="logs", output_file="learned_preferences.json", top_n=5):
-    log_path = Path(log_dir)
-    if not log_path.exists():
-        print("No logs found.")
-        return
 
+def summarize_entry(entry, endings, tone_notes):
+    """Add the phrases and tone markers of one approved log entry."""
+    final_text = entry.get("final_commendation", "").strip()
+
+    # Phrase frequency
+    endings.update(extract_phrases(final_text))
+
+    # Common tone markers
+    lowered = final_text.lower()
+    if "best wishes" in lowered or "all the best" in lowered:
+        tone_notes.add("Closing: Friendly")
+    if "dedication" in lowered or "service" in lowered:
+        tone_notes.add("Theme: Service and Impact")
+
+    if "community" in lowered:
+        tone_notes.add("Focus: Community")
+
+
+def _open_log(path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _head(path):
+    # The first line identifies a live log after it is rotated into a segment.
+    with _open_log(path) as f:
+        return hashlib.sha256(f.readline()).hexdigest()
+
+
+def summarize_file(path, offset=0):
+    """Summarize the complete lines of ``path`` after byte ``offset``.
+
+    Returns the offset to resume from, the phrase counts and the tone notes.
+    Offsets count uncompressed bytes for gzipped segments. A trailing line
+    without a newline is left for the next run.
+    """
+    path = Path(path)
     endings = Counter()
     tone_notes = set()
+    with _open_log(path) as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("approved"):
+                summarize_entry(entry, endings, tone_notes)
+    return offset, endings, tone_notes
 
-    for log_file in log_path.glob("cert_logs_*.jsonl"):
-        with open(log_file, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if not entry.get("approved"): continue
-                    final_text = entry.get("final_commendation", "").strip()
 
-                    # Phrase frequency
-                    phrases = extract_phrases(final_text)
-                    endings.update(phrases)
+def _segment_order(path):
+    # Rotated segments of a day come before its live file, in rotation order.
+    parts = path.name.split(".")
+    return parts[0], int(parts[1]) if path.suffix == ".gz" else float("inf")
 
-                    # Common tone markers
-                    if "best wishes" in final_text.lower() or "all the best" in final_text.lower():
-                        tone_notes.add("Closing: Friendly")
-                    if "dedication" in final_text.lower() or "service" in final_text.lower():
-                        tone_notes.add("Theme: Service and Impact")
 
-                    if "community" in final_text.lower():
-                        tone_notes.add("Focus: Community")
+def _plan(log_path, files):
+    """Return ``(path, offset)`` tasks for log files with unread lines.
 
-                except json.JSONDecodeError:
-                    continue
+    A live file read last time may since have been rotated into a segment,
+    so its record is matched by day and first line even when the live file
+    is gone. Records that match nothing are kept in ``files``.
+    """
+    tasks = []
+    logs = sorted(log_path.glob("cert_logs_*.jsonl*"), key=_segment_order)
+    live = {}
+    for name in [name for name in files if not name.endswith(".gz")]:
+        live[name.split(".")[0]] = files.pop(name)
+    for path in logs:
+        day = path.name.split(".")[0]
+        if path.name in files:
+            continue  # a segment that was read completely
+        # A segment or live file that starts like the last live file we read
+        # continues from where that read stopped.
+        offset = 0
+        previous = live.get(day)
+        if previous is not None and previous["head"] == _head(path):
+            offset = previous["offset"]
+            del live[day]
+        tasks.append((path, offset))
+    files.update({f"{day}.jsonl": record for day, record in live.items()})
+    return tasks
+
+
+def summarize_logs(
+    log_dir="logs",
+    output_file="learned_preferences.json",
+    top_n=5,
+    checkpoint_file=None,
+    workers=None,
+    full=False,
+):
+    """Update the learned preferences with log lines added since the last run.
+
+    Per-file offsets and the running counts are kept in ``checkpoint_file``
+    (``<log_dir>/learned_preferences.checkpoint.json`` by default), so only
+    new lines are read. ``full`` ignores the checkpoint and rescans everything.
+    """
+    log_path = Path(log_dir)
+    if not log_path.exists():
+        print("No logs found.")
+        return
+
+    checkpoint_path = Path(checkpoint_file or log_path / CHECKPOINT_NAME)
+    checkpoint = {}
+    if checkpoint_path.exists() and not full:
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    files = checkpoint.get("files", {})
+    endings = Counter(checkpoint.get("endings", {}))
+    tone_notes = set(checkpoint.get("tone_notes", []))
+
+    tasks = _plan(log_path, files)
+    paths = [path for path, _ in tasks]
+    offsets = [offset for _, offset in tasks]
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(summarize_file, paths, offsets))
+    else:
+        results = [summarize_file(path, offset) for path, offset in tasks]
+
+    for path, (offset, file_endings, file_notes) in zip(paths, results):
+        endings.update(file_endings)
+        tone_notes |= file_notes
+        files[path.name] = {
+            # Gzipped segments never change, so they are not read again.
+            "offset": None if path.suffix == ".gz" else offset,
+            "head": _head(path),
+        }
+    # Drop records of deleted segments, and of live files whose day is gone.
+    existing = {path.name for path in log_path.glob("cert_logs_*.jsonl*")}
+    days = {name.split(".")[0] for name in existing}
+    files = {
+        name: record
+        for name, record in files.items()
+        if name in existing or (not name.endswith(".gz") and name.split(".")[0] in days)
+    }
+
+    checkpoint_path.write_text(
+        json.dumps(
+            {"files": files, "endings": endings, "tone_notes": sorted(tone_notes)}
+        ),
+        encoding="utf-8",
+    )
 
     # Write to JSON
     summary = {
@@ -50,7 +172,28 @@ def summarize_logs(log_dir="logs", output_file="learned_preferences.json", top_n
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(summary, f, indent=2)
 
-    print(f"Saved learned preferences to {output_file}")
+    print(f"Saved learned preferences to {output_file} ({len(tasks)} log files read)")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize approved certificate logs.")
+    parser.add_argument("--log-dir", default="logs")
+    parser.add_argument("-o", "--output", default="learned_preferences.json")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--checkpoint", help="checkpoint path (default: <log-dir>/%s)" % CHECKPOINT_NAME)
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and rescan all logs")
+    args = parser.parse_args(argv)
+    summarize_logs(
+        args.log_dir,
+        args.output,
+        top_n=args.top_n,
+        checkpoint_file=args.checkpoint,
+        workers=args.workers,
+        full=args.full,
+    )
+
 
 if __name__ == "__main__":
-    summarize_logs()
+    main()
@@ -55,11 +55,29 @@ class SemanticMemory:
         return vectors
 
     def add(self, texts: list[str], tags: list[str]):
-        vectors = self.embed(texts)
+        # Embed one text at a time so a skipped text drops its own tag rather
+        # than shifting every later tag onto the wrong vector.
+        vectors = []
+        kept = []
+        for text, tag in zip(texts, tags):
+            embedded = self.embed([text])
+            if embedded:
+                vectors.append(embedded[0])
+                kept.append(tag)
         if not vectors:
             return
         self.index.add(np.array(vectors).astype("float32"))
-        self.metadata.extend(tags[: len(vectors)])
+        self.metadata.extend(kept)
+        self.save()
+
+    def remove(self, positions: list[int]):
+        # Drop the vectors at ``positions``; later vectors shift down, as do
+        # their tags.
+        if not positions:
+            return
+        self.index.remove_ids(np.array(sorted(positions), dtype="int64"))
+        drop = set(positions)
+        self.metadata = [tag for i, tag in enumerate(self.metadata) if i not in drop]
         self.save()
 
     def search(self, query: str, top_k: int = 5) -> list[tuple[str, float]]:
@@ -68,4 +86,5 @@ class SemanticMemory:
             return []
         query_vec = query_vecs[0]
         D, I = self.index.search(np.array([query_vec]).astype("float32"), top_k)
-        return [(self.metadata[i], float(D[0][j])) for j, i in enumerate(I[0])]
+        # FAISS pads with -1 when the index holds fewer than top_k vectors
+        return [(self.metadata[i], float(D[0][j])) for j, i in enumerate(I[0]) if i >= 0]
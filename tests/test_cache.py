@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.cache import PersistentCache
+
+
+def test_cache_round_trip_counts_hits_and_misses(tmp_path):
+    cache = PersistentCache(tmp_path / "cache.sqlite3")
+    key = PersistentCache.make_key("model", "prompt", "text", False)
+
+    assert cache.get(key) is None
+    cache.set(key, "value")
+    assert cache.get(key) == "value"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used_when_over_size(tmp_path):
+    cache = PersistentCache(tmp_path / "cache.sqlite3", max_bytes=10)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    cache.get("a")
+    cache.set("c", "12345")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "12345"
+    assert cache.get("c") == "12345"
+
+
+def test_cache_expires_old_entries(tmp_path):
+    cache = PersistentCache(tmp_path / "cache.sqlite3", max_age=-1)
+    cache.set("a", "value")
+
+    assert cache.get("a") is None
@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cert_batch import bundle_names
+
+
+def test_bundle_names_keep_requests_with_the_same_stem_apart():
+    paths = ["in/a.pdf", "in/A.docx", "in/a_pdf.txt", "in/flyer.png"]
+
+    assert bundle_names(paths) == ["a_pdf", "A_docx", "a_pdf_2", "flyer"]
@@ -0,0 +1,465 @@
+import json
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils import cert_engine
+from LegAid.utils.cache import PersistentCache
+from LegAid.utils.cert_log_store import get_log_store
+from LegAid.utils.log_writer import get_log_writer
+from LegAid.utils.cert_engine import (
+    format_certificate_date,
+    generate_pdf_certificates,
+    read_document,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path, monkeypatch):
+    cache = PersistentCache(tmp_path / "llm_responses.sqlite3")
+    monkeypatch.setattr(cert_engine, "llm_cache", cache)
+    return cache
+
+
+def _entry(name="Jane Doe"):
+    return {
+        "Name": name,
+        "Title": "President",
+        "Organization": "Rotary Club",
+        "Certificate_Text": "On behalf of the California State Legislature, congratulations.",
+        "Formatted_Date": "Dated the 14th of June\nTwo Thousand and Twenty-Five",
+    }
+
+
+def _fake_client(reply):
+    """Return a stand-in OpenAI client whose completions come from ``reply``.
+
+    ``reply(messages)`` returns the completion text, or ``(text,
+    finish_reason)``. Streamed completions arrive in 7-character deltas with
+    the finish reason on the last one. Each request is recorded in
+    ``client.calls``.
+    """
+    calls = []
+
+    def create(messages, stream=False, **kwargs):
+        calls.append(SimpleNamespace(messages=messages, stream=stream))
+        text = reply(messages)
+        text, finish_reason = text if isinstance(text, tuple) else (text, "stop")
+        if not stream:
+            message = SimpleNamespace(content=text)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+        deltas = [text[i : i + 7] for i in range(0, len(text), 7)]
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(
+                delta=SimpleNamespace(content=delta),
+                finish_reason=finish_reason if n == len(deltas) - 1 else None,
+            )])
+            for n, delta in enumerate(deltas)
+        )
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)), calls=calls)
+
+
+def test_format_certificate_date_spells_out_year():
+    assert format_certificate_date("June 14, 2025") == (
+        "Dated the 14th of June\nTwo Thousand and Twenty-Five"
+    )
+
+
+def test_generate_pdf_certificates_one_page_per_entry():
+    import fitz
+
+    pdf_bytes = generate_pdf_certificates([_entry(), _entry("John Roe")])
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        assert doc.page_count == 2
+
+
+def test_read_document_plain_text(tmp_path):
+    path = tmp_path / "request.txt"
+    path.write_text("Honor Jane Doe on June 14", encoding="utf-8")
+
+    assert read_document(path) == ("Honor Jane Doe on June 14", "txt")
+
+
+def test_read_bytes_parses_docx_in_memory():
+    from io import BytesIO
+
+    from docx import Document
+
+    doc = Document()
+    doc.add_paragraph("Honor Jane Doe")
+    buf = BytesIO()
+    doc.save(buf)
+
+    text, source_type = cert_engine.read_bytes(memoryview(buf.getvalue()), "request.docx")
+
+    assert "Honor Jane Doe" in text
+    assert source_type == "docx"
+
+
+def test_regenerate_certificates_isolates_failures():
+    from LegAid.utils.cert_engine import regenerate_certificates
+
+    def reply(messages):
+        if "Bad Name" in messages[1]["content"]:
+            raise RuntimeError("boom")
+        return json.dumps({"commendation": "We thank you."})
+
+    client = _fake_client(reply)
+    certs = [_entry(), _entry("Bad Name"), _entry("John Roe")]
+    seen = []
+
+    rows, errors = regenerate_certificates(
+        certs,
+        "Make it warmer",
+        max_workers=2,
+        progress=lambda done, total: seen.append((done, total)),
+        client=client,
+    )
+
+    assert [r["Name"] for r in rows] == ["Jane Doe", "Bad Name", "John Roe"]
+    assert rows[0]["Certificate_Text"] == "I thank you."
+    assert [idx for idx, _ in errors] == [1]
+    assert seen[-1] == (3, 3)
+
+
+def test_extract_certificates_reuses_cached_reply(isolated_llm_cache):
+    payload = [{"name": "Jane Doe", "title": "President", "commendation": "Thanks."}]
+    client = _fake_client(lambda messages: json.dumps(payload))
+
+    first = cert_engine.extract_certificates("Honor Jane  Doe", "June 14, 2025", client=client)
+    second = cert_engine.extract_certificates("Honor Jane Doe\n", "June 14, 2025", client=client)
+
+    assert len(client.calls) == 1
+    assert first[1] == second[1]
+    assert isolated_llm_cache.stats()["hits"] == 1
+
+
+def test_extract_pdf_text_ocrs_only_image_pages(tmp_path, monkeypatch):
+    import fitz
+
+    path = tmp_path / "packet.pdf"
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 20), False)
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Cover letter")
+        doc.new_page().insert_image(fitz.Rect(72, 72, 200, 200), pixmap=pixmap)
+        doc.new_page()
+        doc.new_page().insert_text((72, 72), "Closing page")
+        doc.save(str(path))
+
+    calls = []
+
+    def fake_ocr(image_bytes, key):
+        calls.append(image_bytes)
+        return "Scanned flyer"
+
+    monkeypatch.setattr(cert_engine, "vision_ocr_image", fake_ocr)
+
+    text = cert_engine.extract_pdf_text(path.read_bytes(), "key")
+
+    assert [line for line in text.splitlines() if line] == [
+        "Cover letter",
+        "Scanned flyer",
+        "Closing page",
+    ]
+    assert len(calls) == 1
+
+
+def test_extract_pdf_text_keeps_page_order_of_concurrent_ocr(tmp_path, monkeypatch):
+    import io
+    import time
+
+    import fitz
+    from PIL import Image
+
+    path = tmp_path / "scan.pdf"
+    with fitz.open() as doc:
+        for shade in (10, 20, 30, 40, 50):
+            pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 8, 8), False)
+            pixmap.clear_with(shade)
+            page = doc.new_page()
+            page.insert_image(page.rect, pixmap=pixmap)
+        doc.save(str(path))
+
+    def fake_ocr(image_bytes, key):
+        # Earlier pages answer last, so completion order is reversed.
+        shade = Image.open(io.BytesIO(image_bytes)).convert("L").getpixel((5, 5))
+        page = round(shade / 10)
+        time.sleep(0.01 * (5 - page))
+        return f"page {page}"
+
+    monkeypatch.setattr(cert_engine, "vision_ocr_image", fake_ocr)
+
+    text = cert_engine.extract_pdf_text(path.read_bytes(), "key", ocr_workers=5)
+
+    assert text.splitlines() == [f"page {n}" for n in range(1, 6)]
+
+
+def test_generate_word_certificates_matches_page_by_page_build():
+    from lxml import etree
+
+    entries = [
+        _entry(),
+        {**_entry("A Considerably Longer Recipient Name"), "Title": "", "Organization": ""},
+        {**_entry(" Padded "), "Certificate_Text": "Line one\nLine\ttwo", "Formatted_Date": "Dated ______"},
+    ]
+
+    expected = cert_engine._new_word_document()
+    for i, entry in enumerate(entries):
+        if i > 0:
+            cert_engine._add_page_break(expected)
+        cert_engine._add_certificate_page(expected, entry)
+    cert_engine._add_signature_block(expected)
+
+    actual = cert_engine.generate_word_certificates(entries)
+
+    assert etree.tostring(actual.element) == etree.tostring(expected.element)
+
+
+def test_render_pdf_sharded_merges_shards_in_order(tmp_path):
+    import fitz
+
+    entries = [_entry(f"Recipient {i}") for i in range(7)]
+    output = tmp_path / "Certificates.pdf"
+
+    cert_engine.render_pdf_sharded(entries, workers=2, shard_size=3, output_path=output)
+
+    with fitz.open(output) as doc:
+        assert doc.page_count == 7
+        assert [page.get_text().splitlines()[0] for page in doc] == [
+            f"Recipient {i}" for i in range(7)
+        ]
+
+
+def test_log_certificates_dedupes_within_a_session_only(tmp_path):
+    rows = [dict(_entry(), approved=True)]
+    for session in ("review-1", "review-1", "review-2", None, None):
+        cert_engine.log_certificates([], rows, "event", log_dir=tmp_path, session=session)
+    get_log_writer(tmp_path).flush()
+
+    assert get_log_store(tmp_path).count() == 4
+
+
+def test_commendation_style_matches_substring_scans():
+    import random
+
+    def legacy_style(category, context):
+        for style, context_words, category_words in cert_engine.TONE_KEYWORDS:
+            if any(w in context.lower() for w in context_words) or any(
+                w in category.lower() for w in category_words
+            ):
+                return style
+        return "formal"
+
+    keywords = [w for _, ctx, cat in cert_engine.TONE_KEYWORDS for w in ctx + cat]
+    rng = random.Random(7)
+    for _ in range(2000):
+        # Glue keyword fragments together so matches overlap and straddle words.
+        parts = [rng.choice(keywords)[rng.randrange(3):] for _ in range(rng.randrange(4))]
+        context = "".join(rng.choice([p.upper(), p, " ", "x"]) for p in parts)
+        category = rng.choice(keywords + ["", "Volunteer"]).title()
+        assert cert_engine.commendation_style(category, context) == legacy_style(category, context)
+
+
+def test_extract_certificates_streams_rows_once_each():
+    payload = {
+        "certificates": [{"name": "Jane Doe"}, {"name": "John Roe"}],
+        "template": "Honoring {name}.",
+    }
+    client = _fake_client(lambda messages: json.dumps(payload))
+    rows = []
+
+    _, cert_rows, template = cert_engine.extract_certificates(
+        "Honor Jane Doe and John Roe", "June 14, 2025", uniform=True,
+        client=client, on_certificate=rows.append,
+    )
+
+    # The template arrives last, so both rows are held back until then.
+    assert [call.stream for call in client.calls] == [True]
+    assert rows == cert_rows
+    assert rows[0]["Certificate_Text"] == "Honoring Jane Doe Wish you the best."
+
+    cached = []
+    cert_engine.extract_certificates(
+        "Honor Jane Doe and John Roe", "June 14, 2025", uniform=True,
+        client=client, on_certificate=cached.append,
+    )
+    assert len(client.calls) == 1 and cached == cert_rows
+
+
+def test_split_request_text_prefers_document_structure():
+    from LegAid.utils.cert_engine import split_request_text
+
+    paragraphs = [f"Honoree {i}." + " Served the community." * 5 for i in range(6)]
+    text = "\n\n".join(paragraphs)
+    chunks = split_request_text(text, 300)
+
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+    assert split_request_text("a" * 50 + ". " + "b" * 50, 40) == ["a" * 40, "a" * 10 + ".", "b" * 40, "b" * 10]
+
+
+def test_extract_certificates_chunked_merges_and_dedupes_chunks():
+    def reply(messages):
+        names = re.findall(r"Honor (\w+ \w+)", messages[1]["content"])
+        return json.dumps({
+            "certificates": [{"name": name, "organization": "Rotary"} for name in names],
+            "template": f"Honoring {{name}} (chunk {len(client.calls)}).",
+        })
+
+    client = _fake_client(reply)
+    people = ["Jane Doe", "John Roe", "Ann Lee", "Bob Ray", "Jane Doe"]
+    text = "Rotary gala.\n\n" + "\n\n".join(f"Honor {p} for service." for p in people)
+    rows = []
+
+    parsed, cert_rows, template = cert_engine.extract_certificates_chunked(
+        text, "June 14, 2025", uniform=True, client=client,
+        on_certificate=rows.append, chunk_chars=60, max_workers=2,
+    )
+
+    assert len(client.calls) > 1
+    assert all(call.messages[1]["content"].startswith("Rotary gala.") for call in client.calls)
+    assert [r["Name"] for r in cert_rows] == ["Jane Doe", "John Roe", "Ann Lee", "Bob Ray"]
+    assert rows == cert_rows and len(parsed) == 4
+    assert {r["Certificate_Text"].split(" (")[1] for r in cert_rows} == {template.split(" (")[1]}
+
+
+def test_extract_certificates_chunked_keeps_partial_entries_and_repeats_within_a_chunk():
+    def reply(messages):
+        text = messages[1]["content"]
+        entries = [{"name": "", "organization": ""} for _ in re.findall(r"Honor a volunteer", text)]
+        entries += [{"name": "Ann Lee"} for _ in re.findall(r"Honor Ann Lee", text)]
+        return json.dumps(entries)
+
+    client = _fake_client(reply)
+    text = "\n\n".join(["Volunteer awards."] + ["Honor a volunteer for service."] * 6)
+    for chunk_chars in (60, len(text) + 1):
+        rows = []
+        _, cert_rows, _ = cert_engine.extract_certificates_chunked(
+            text, "June 14, 2025", client=client, on_certificate=rows.append, chunk_chars=chunk_chars,
+        )
+        assert len(cert_rows) == 6 and rows == cert_rows
+
+    # A name repeated inside one chunk is kept; one repeated by a later chunk is not.
+    text = "Awards.\n\nHonor Ann Lee. Honor Ann Lee.\n\nHonor Ann Lee for service."
+    _, cert_rows, _ = cert_engine.extract_certificates_chunked(
+        text, "June 14, 2025", client=client, chunk_chars=35,
+    )
+    assert len(cert_rows) == 2
+
+
+def test_name_font_size_fits_measured_width():
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    from LegAid.utils.cert_engine import (
+        CERT_BOX_WIDTH,
+        NAME_MAX_SIZE,
+        NAME_MIN_SIZE,
+        determine_name_font_size,
+        determine_text_font_size,
+    )
+
+    narrow = "Lili Ilif Jill Tiff Illi Fil"
+    wide = "MWMW WOMW MMMW WWMO MWW"
+    assert len(narrow) > len(wide)
+    assert determine_name_font_size(narrow) > determine_name_font_size(wide)
+    for name in (narrow, wide, "Jane Doe"):
+        size = determine_name_font_size(name)
+        assert stringWidth(name, "Times-Bold", size) <= CERT_BOX_WIDTH
+        if size < NAME_MAX_SIZE:
+            assert stringWidth(name, "Times-Bold", size + 1) > CERT_BOX_WIDTH
+    assert determine_name_font_size("M" * 80) == NAME_MIN_SIZE
+    assert determine_text_font_size("Congratulations.") == cert_engine.TEXT_MAX_SIZE
+
+
+def test_text_font_size_shrinks_long_commendations():
+    from LegAid.utils.cert_engine import (
+        CERT_BOX_WIDTH,
+        TEXT_MAX_LINES,
+        TEXT_MAX_SIZE,
+        TEXT_MIN_SIZE,
+        determine_text_font_size,
+    )
+    from LegAid.utils.pdf_layout import fits
+
+    text = (
+        "On behalf of the California State Senate, congratulations on your many years of "
+        "service to the children and families of the Central Valley. Your leadership of the "
+        "after-school tutoring program, the weekend food pantry and the summer reading camp "
+        "has changed lives across our community, and your example will inspire neighbors "
+        "for years to come."
+    )
+    assert not fits(text, "Times-Roman", TEXT_MAX_SIZE, CERT_BOX_WIDTH, TEXT_MAX_LINES)
+
+    size = determine_text_font_size(text)
+    assert TEXT_MIN_SIZE <= size < TEXT_MAX_SIZE
+    assert fits(text, "Times-Roman", size, CERT_BOX_WIDTH, TEXT_MAX_LINES)
+    assert not fits(text, "Times-Roman", size + 1, CERT_BOX_WIDTH, TEXT_MAX_LINES)
+
+
+def test_certificate_preview_html_is_memoized():
+    cert_engine._certificate_preview_html.cache_clear()
+    first = cert_engine.certificate_preview_html("Jane Doe", "President", "Rotary", "Thanks.", highlight={"name"})
+    second = cert_engine.certificate_preview_html("Jane Doe", "President", "Rotary", "Thanks.", highlight={"name"})
+
+    assert first is second
+    assert "color:red" in first
+    assert cert_engine._certificate_preview_html.cache_info().hits == 1
+
+
+def _truncating_reply(messages, limit=10):
+    # Replies to prompts naming more than ``limit`` honorees stop mid-array,
+    # as a completion that hits max_tokens does.
+    names = re.findall(r"Honor (\w+ \w+)", messages[1]["content"])
+    reply = json.dumps([{"name": name, "commendation": "Thanks."} for name in names])
+    if len(names) > limit:
+        return reply[: reply.index("}", reply.index("}") + 1) + 3], "length"
+    return reply
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_extract_certificates_chunked_retries_truncated_replies(
+    monkeypatch, isolated_llm_cache, stream
+):
+    monkeypatch.setattr(cert_engine, "EXTRACT_MIN_CHUNK_CHARS", 50)
+    names = [f"Person{i} Lastname{i}" for i in range(40)]
+    text = "\n".join(f"Honor {name} for service." for name in names)
+    client = _fake_client(_truncating_reply)
+    rows = []
+
+    _, cert_rows, _ = cert_engine.extract_certificates_chunked(
+        text, "June 14, 2025", client=client,
+        on_certificate=rows.append if stream else None, chunk_chars=len(text) + 1,
+    )
+
+    assert client.calls[0].messages[1]["content"].count("Honor ") == 40 and len(client.calls) > 1
+    assert [r["Name"] for r in cert_rows] == names
+    if stream:
+        assert rows and [r["Name"] for r in rows] == names
+
+    # The truncated reply was not cached, so a rerun retries it.
+    with pytest.raises(json.JSONDecodeError):
+        cert_engine.extract_certificates(text, "June 14, 2025", client=_fake_client(_truncating_reply))
+
+
+def test_extract_certificates_looks_up_examples_only_on_cache_miss():
+    client = _fake_client(lambda messages: json.dumps([{"name": "Jane Doe"}]))
+    lookups = []
+
+    def examples(commendation):
+        def lookup():
+            lookups.append(commendation)
+            return [{"final_name": "Ann Lee", "final_commendation": commendation}]
+        return lookup
+
+    cert_engine.extract_certificates("Honor Jane Doe", "June 14, 2025", client=client, examples=examples("Well done."))
+    # The index has grown, but the cached reply is still used and no lookup is made.
+    cert_engine.extract_certificates("Honor Jane Doe", "June 14, 2025", client=client, examples=examples("Bravo."))
+
+    assert lookups == ["Well done."]
+    assert len(client.calls) == 1 and "Well done." in client.calls[0].messages[0]["content"]
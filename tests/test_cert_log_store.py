@@ -0,0 +1,44 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils import cert_engine
+from LegAid.utils.cert_log_store import get_log_store
+from LegAid.utils.log_writer import get_log_writer
+
+
+def _entry(name="Jane Doe"):
+    return {
+        "Name": name,
+        "Title": "President",
+        "Organization": "Rotary Club",
+        "Certificate_Text": "On behalf of the California State Legislature, congratulations.",
+        "Formatted_Date": "Dated the 14th of June\nTwo Thousand and Twenty-Five",
+    }
+
+
+def test_log_store_indexes_new_and_existing_logs(tmp_path):
+    old = {"timestamp": "2024-01-02T10:00:00", "approved": True, "final_name": "Old Recipient"}
+    (tmp_path / "cert_logs_2024-01-02.jsonl").write_text(json.dumps(old) + "\n")
+
+    rows = [
+        dict(_entry("Approved Recipient"), approved=True, Category="Retirement"),
+        dict(_entry("Rejected Recipient"), approved=False),
+    ]
+    cert_engine.log_certificates([], rows, "event", log_dir=tmp_path)
+    rows.append(dict(_entry("Second Recipient"), approved=True, Category="Retirement"))
+    cert_engine.log_certificates([], rows, "event", log_dir=tmp_path)
+    get_log_writer(tmp_path).flush()
+
+    store = get_log_store(tmp_path)
+    assert store.count() == 4
+    assert store.entries()[0]["final_name"] == "Old Recipient"
+    examples = cert_engine.load_example_certificates(5, log_dir=tmp_path, category="Retirement")
+    assert sorted(e["final_name"] for e in examples) == [
+        "Approved Recipient",
+        "Approved Recipient",
+        "Second Recipient",
+    ]
+    assert len(cert_engine.load_example_certificates(1, log_dir=tmp_path)) == 1
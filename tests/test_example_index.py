@@ -0,0 +1,89 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils import cert_engine, example_index
+from LegAid.utils.example_index import CertificateExampleIndex
+from LegAid.utils.log_writer import CertificateLogWriter
+
+
+class _WordOverlapMemory:
+    """In-memory stand-in for SemanticMemory that ranks by shared words."""
+
+    def __init__(self):
+        self.texts, self.metadata = [], []
+        self.index = SimpleNamespace(ntotal=0)
+
+    def add(self, texts, tags):
+        self.texts += texts
+        self.metadata += tags
+        self.index.ntotal = len(self.texts)
+
+    def remove(self, positions):
+        keep = [i for i in range(len(self.texts)) if i not in set(positions)]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadata = [self.metadata[i] for i in keep]
+        self.index.ntotal = len(self.texts)
+
+    def search(self, query, top_k=5):
+        words = set(query.lower().split())
+        scored = sorted(
+            zip(self.metadata, self.texts),
+            key=lambda item: -len(words & set(item[1].lower().split())),
+        )
+        return [(meta, 0.0) for meta, _ in scored[:top_k]]
+
+
+def test_example_index_returns_distinct_similar_certificates():
+    index = CertificateExampleIndex(memory=_WordOverlapMemory())
+    retirement = {"category": "Retirement", "final_commendation": "Congratulations on your retirement."}
+    index.add([retirement, retirement, {"category": "Grand Opening", "final_commendation": "Celebrating your new store."}])
+    index.add([{"category": "Empty", "final_commendation": ""}])
+
+    assert len(index) == 3
+    examples = index.search("retirement party for a teacher", n=2)
+    assert [e["category"] for e in examples] == ["Retirement", "Grand Opening"]
+
+    prompt = cert_engine.build_extraction_prompt("May 31, 2024", examples=examples)
+    assert "Example 1 (Retirement)" in prompt
+    assert prompt.startswith(cert_engine.build_extraction_prompt("May 31, 2024"))
+
+
+def test_example_index_is_built_from_the_store_and_pruned_with_the_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(example_index, "SemanticMemory", lambda **paths: _WordOverlapMemory())
+    monkeypatch.setattr(example_index, "_indexes", {})
+    old = {
+        "timestamp": "2024-05-30T09:00:00", "approved": True, "category": "Retirement",
+        "final_name": "Old" * 60, "final_commendation": "Happy retirement.",
+    }
+    (tmp_path / "cert_logs_2024-05-30.jsonl").write_text(json.dumps(old) + "\n", encoding="utf-8")
+
+    index = example_index.get_example_index(tmp_path)
+    assert len(index) == 1 and index.memory.metadata[0]["date"] == "2024-05-30"
+
+    writer = CertificateLogWriter(tmp_path, max_bytes=100, max_total_bytes=600)
+    for i in range(6):
+        writer.submit([dict(old, timestamp="2024-05-31T09:00:00", final_name=f"{i}" * 180)])
+    writer.flush()
+
+    assert not list(tmp_path.glob("cert_logs_2024-05-30*"))
+    assert len(index) == 6
+    assert {example["date"] for example in index.memory.metadata} == {"2024-05-31"}
+
+
+def test_example_index_warns_when_unavailable(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(example_index, "SemanticMemory", None)
+    monkeypatch.setattr(example_index, "_IMPORT_ERROR", ImportError("No module named 'modules'"), raising=False)
+    monkeypatch.setattr(example_index, "_indexes", {})
+
+    with caplog.at_level("WARNING", logger=example_index.__name__):
+        assert example_index.similar_examples("Honor Jane Doe", log_dir=tmp_path) == []
+        assert example_index.similar_examples("Honor John Roe", log_dir=tmp_path) == []
+
+    assert [r.getMessage() for r in caplog.records] == [
+        "Certificate example index unavailable, extraction prompts get no examples: "
+        "No module named 'modules'"
+    ]
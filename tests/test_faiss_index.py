@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("faiss")
+
+from modules.faiss_index import SemanticMemory
+
+
+def test_semantic_memory_keeps_tags_with_their_vectors(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    memory = SemanticMemory(str(tmp_path / "index.faiss"), str(tmp_path / "meta.pkl"))
+    vectors = {"alpha": [1.0] + [0.0] * 1535, "gamma": [0.0, 1.0] + [0.0] * 1534}
+    monkeypatch.setattr(memory, "embed", lambda texts: [vectors[t] for t in texts if t in vectors])
+
+    memory.add(["alpha", "beta", "gamma"], ["a", "b", "c"])
+
+    assert memory.metadata == ["a", "c"]
+    assert memory.search("gamma", top_k=1)[0][0] == "c"
+    memory.remove([0])
+    assert memory.metadata == ["c"] and memory.index.ntotal == 1
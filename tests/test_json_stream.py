@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.json_stream import CertificateStreamParser
+
+
+def test_stream_parser_emits_certificates_as_they_close():
+    reply = (
+        'Here you go:\n```json\n{"template": "Honoring {name} \\"always\\" {",'
+        ' "certificates": [{"name": "A", "alternatives": {"name": ["A1", "[x]"]}},'
+        ' {"name": "B}"}]}\n``` [{"name": "ignored"}]'
+    )
+    parser = CertificateStreamParser()
+    emitted = []
+    for i, char in enumerate(reply):
+        emitted += [(i, item["name"]) for item in parser.feed(char)]
+
+    assert [name for _, name in emitted] == ["A", "B}"]
+    assert emitted[0][0] == reply.index('}}') + 1  # as soon as A's brace closes
+    assert parser.fields["template"] == 'Honoring {name} "always" {'
+    assert parser.done
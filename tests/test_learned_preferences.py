@@ -0,0 +1,61 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from learned_preferences_writer import CHECKPOINT_NAME, summarize_logs
+
+
+def _line(text, approved=True):
+    return json.dumps({"approved": approved, "final_commendation": text}) + "\n"
+
+
+def test_incremental_summary_matches_full_rescan(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    live = logs / "cert_logs_2024-05-31.jsonl"
+    live.write_text(_line("Thank you for your dedication to service.") + _line("Ignored line", False))
+    (logs / "cert_logs_2024-05-30.jsonl").write_text(_line("Best wishes to our community."))
+    output = tmp_path / "prefs.json"
+    summarize_logs(logs, output, workers=1)
+
+    # The live log grows, then is rotated into a segment and restarted.
+    with live.open("a") as f:
+        f.write(_line("Thank you for your dedication to service."))
+    with gzip.open(logs / "cert_logs_2024-05-31.1.jsonl.gz", "wb") as f:
+        f.write(live.read_bytes())
+    live.write_text(_line("All the best in retirement, friend.") + '{"partial": ')
+    summarize_logs(logs, output)
+    incremental = json.loads((logs / CHECKPOINT_NAME).read_text())
+
+    summarize_logs(logs, output, checkpoint_file=tmp_path / "full.json", full=True)
+    full = json.loads((tmp_path / "full.json").read_text())
+    assert incremental["endings"] == full["endings"] == {
+        "Thank you for your dedication to service.": 2,
+        "Best wishes to our community.": 1,
+        "All the best in retirement, friend.": 1,
+    }
+    assert incremental["tone_notes"] == full["tone_notes"]
+    assert json.loads(output.read_text())["common_phrases"][0].startswith("Thank you")
+
+
+def test_rotated_day_is_not_counted_twice(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    live = logs / "cert_logs_2024-05-31.jsonl"
+    live.write_text(_line("Thank you for your dedication to service."))
+    output = tmp_path / "prefs.json"
+    summarize_logs(logs, output, workers=1)
+
+    # The finished day is rotated with no later write, so no live file remains.
+    with gzip.open(logs / "cert_logs_2024-05-31.1.jsonl.gz", "wb") as f:
+        f.write(live.read_bytes())
+    live.unlink()
+    summarize_logs(logs, output, workers=1)
+    summarize_logs(logs, output, workers=1)
+
+    checkpoint = json.loads((logs / CHECKPOINT_NAME).read_text())
+    assert checkpoint["endings"] == {"Thank you for your dedication to service.": 1}
+    assert list(checkpoint["files"]) == ["cert_logs_2024-05-31.1.jsonl.gz"]
@@ -0,0 +1,47 @@
+import gzip
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.log_writer import CertificateLogWriter
+
+
+def test_log_writer_dedupes_submissions_and_rotates_segments(tmp_path):
+    writer = CertificateLogWriter(tmp_path, max_bytes=200, max_total_bytes=400)
+    batch = [{"timestamp": "2024-05-31T09:00:00", "approved": True, "final_name": "A" * 150}]
+    writer.submit(batch, "download-1")
+    writer.submit(batch, "download-1")
+    writer.flush()
+
+    # A repeated submission is dropped, but the same set approved again later
+    # is a new submission and is logged.
+    assert writer.store.count() == 1
+    writer.submit([dict(batch[0], timestamp="2024-05-31T10:00:00")])
+    writer.flush()
+    assert writer.store.count() == 2
+    segments = sorted(tmp_path.glob("cert_logs_*.jsonl.gz"))
+    assert [p.name for p in segments] == [
+        "cert_logs_2024-05-31.1.jsonl.gz",
+        "cert_logs_2024-05-31.2.jsonl.gz",
+    ]
+    assert gzip.decompress(segments[0].read_bytes()).count(b"\n") == 1
+
+    for i in range(10):
+        writer.submit([dict(batch[0], final_name=f"{i}" * 300)])
+    writer.flush()
+    assert not list(tmp_path.glob("cert_logs_*.jsonl"))
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.gz")) <= 400
+
+
+def test_log_writer_prunes_store_with_old_segments(tmp_path):
+    writer = CertificateLogWriter(tmp_path, max_bytes=100, max_total_bytes=600)
+    old = {"timestamp": "2024-05-30T09:00:00", "approved": True, "final_name": "Old" * 60}
+    writer.submit([old])
+    for i in range(6):
+        writer.submit([dict(old, timestamp="2024-05-31T09:00:00", final_name=f"{i}" * 180)])
+    writer.flush()
+
+    assert not list(tmp_path.glob("cert_logs_2024-05-30*"))
+    dates = {row[0] for row in writer.store._connect().execute("SELECT date FROM certificates")}
+    assert dates == {"2024-05-31"}
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils import ocr
+from LegAid.utils.cache import PersistentCache
+
+
+def test_ocr_image_bytes_skips_vision_for_known_image(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_post(url, **kwargs):
+        calls.append(url)
+        data = {"responses": [{"fullTextAnnotation": {"text": "Honor Jane Doe"}}]}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: data)
+
+    monkeypatch.setattr(ocr, "ocr_cache", PersistentCache(tmp_path / "ocr.sqlite3"))
+    monkeypatch.setattr(ocr.requests, "post", fake_post)
+
+    assert ocr.ocr_image_bytes(b"png-bytes", "key") == "Honor Jane Doe"
+    assert ocr.vision_ocr_image(b"png-bytes", "key") == "Honor Jane Doe"
+    assert len(calls) == 1
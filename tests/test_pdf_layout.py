@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.pdf_layout import wrap_text
+
+
+def test_wrap_text_matches_string_width_breaks():
+    text = (
+        "On behalf of the California State Legislature, congratulations on your "
+        "exemplary service as President with the Bakersfield Rotary Club.\nWish you the best."
+    )
+    lines = wrap_text(text, "Times-Roman", 20, 300)
+
+    assert " ".join(lines) == " ".join(text.split())
+    assert lines[-1] == "Wish you the best."
+    for line, following in zip(lines, lines[1:]):
+        assert stringWidth(line, "Times-Roman", 20) <= 300
+        if following != "Wish you the best.":
+            extended = f"{line} {following.split()[0]}"
+            assert stringWidth(extended, "Times-Roman", 20) > 300
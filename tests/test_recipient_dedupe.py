@@ -0,0 +1,62 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.recipient_dedupe import (
+    duplicate_groups,
+    flag_possible_duplicates,
+    merge_duplicate,
+    name_parts,
+)
+
+
+def test_duplicate_groups_match_name_variants_within_organization():
+    rows = [
+        {"Name": "Dr. Maria Lopez", "Organization": "Rotary Club", "Title": ""},
+        {"Name": "John Roe", "Organization": "Lions Club", "Title": "President"},
+        {"Name": "Maria Lopez, PhD", "Organization": "", "Title": "Chair"},
+        {"Name": "Lopez, Maria G.", "Organization": "The Rotary Club", "Title": ""},
+        {"Name": "John Roe", "Organization": "City of Fresno", "Title": ""},
+        {"Name": "Joan Rowe", "Organization": "Lions Club", "Title": ""},
+    ]
+
+    assert duplicate_groups(rows) == [[0, 2, 3]]
+    assert flag_possible_duplicates(rows) == 2
+    assert rows[2]["possible_duplicate"] and rows[2]["alternatives"]["duplicate_of"] == "Dr. Maria Lopez"
+
+    merged = merge_duplicate(rows, 2)
+    assert [r["Name"] for r in merged] == [
+        "Dr. Maria Lopez", "John Roe", "Lopez, Maria G.", "John Roe", "Joan Rowe",
+    ]
+    assert merged[0]["Title"] == "Chair"
+    assert merged[2]["possible_duplicate"]
+
+
+def test_duplicate_groups_find_match_in_large_batch():
+    rng = random.Random(0)
+    first = ["Maria", "John", "Ana", "David", "Grace", "Luis", "Mei", "Omar", "Rosa", "Tom"]
+    rows = [
+        {"Name": f"{rng.choice(first)} {''.join(rng.sample('abcdefghijklmnop', 7))}", "Organization": ""}
+        for _ in range(5000)
+    ]
+    rows.append({"Name": f"Dr. {rows[10]['Name']}", "Organization": ""})
+
+    assert [10, 5000] in duplicate_groups(rows)
+
+
+def test_duplicate_groups_keep_generations_and_short_surnames_apart():
+    rows = [
+        {"Name": "John Smith Jr.", "Organization": "Rotary Club"},
+        {"Name": "John Smith Sr.", "Organization": "Rotary Club"},
+        {"Name": "Smith, John, Jr.", "Organization": "Rotary Club"},
+        {"Name": "Anh Do", "Organization": ""},
+        {"Name": "Anh", "Organization": ""},
+        {"Name": "Dr. Anh Do, D.O.", "Organization": ""},
+    ]
+
+    assert name_parts("Anh Do") == (["anh", "do"], "")
+    assert name_parts("Maria Lopez PhD") == (["maria", "lopez"], "")
+    assert name_parts("Smith, John, Jr.") == (["smith", "john"], "jr")
+    assert duplicate_groups(rows) == [[0, 2], [3, 5]]
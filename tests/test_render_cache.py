@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import fitz
+from lxml import etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils import cert_engine
+from LegAid.utils.render_cache import CertificateRenderCache
+
+
+def _entry(name="Jane Doe"):
+    return {
+        "Name": name,
+        "Title": "President",
+        "Organization": "Rotary Club",
+        "Certificate_Text": "On behalf of the California State Legislature, congratulations.",
+        "Formatted_Date": "Dated the 14th of June\nTwo Thousand and Twenty-Five",
+    }
+
+
+def test_render_cache_rerenders_only_changed_pages():
+    cache = CertificateRenderCache()
+    entries = [_entry(f"Recipient {i}") for i in range(5)]
+    cache.pdf_bytes(entries)
+    cache.word_document(entries)
+    rendered = cache.pages_rendered
+
+    entries[2] = _entry("Edited Recipient")
+    entries.insert(0, _entry("New Recipient"))
+    del entries[4]
+    pdf = cache.pdf_bytes(entries)
+    doc = cache.word_document(entries)
+
+    assert cache.pages_rendered - rendered == 4  # two PDF pages, two Word pages
+    with fitz.open(stream=pdf, filetype="pdf") as merged:
+        assert [page.get_text().splitlines()[0] for page in merged] == [
+            entry["Name"] for entry in entries
+        ]
+    expected = cert_engine.generate_word_certificates(entries)
+    assert etree.tostring(doc.element) == etree.tostring(expected.element)
+
+
+def test_render_cache_memoizes_exports_until_approved_set_changes():
+    cache = CertificateRenderCache()
+    entries = [_entry(f"Recipient {i}") for i in range(3)]
+    assert cache.cached_export("pdf", entries) is None
+
+    data, _ = cache.export("pdf", entries)
+    rendered = cache.pages_rendered
+    assert cache.export("pdf", [dict(e) for e in entries])[0] is data
+    assert cache.cached_export("docx", entries) is None
+    assert cache.pages_rendered == rendered
+
+    entries[1] = _entry("Edited Recipient")
+    assert cache.cached_export("pdf", entries) is None
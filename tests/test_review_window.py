@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from LegAid.utils.review_window import find_certificates, page_bounds, page_count, page_of
+
+
+def test_review_window_pages_and_search():
+    rows = [{"Name": f"Person {i}", "Title": "", "Organization": "Rotary"} for i in range(45)]
+    rows[30]["Organization"] = "Lions Club"
+    rows[40]["Name"] = "Lionel Richie"
+
+    assert page_count(45, 20) == 3 and page_count(0, 20) == 1
+    assert page_bounds(45, 3, 20) == (40, 45)
+    assert page_bounds(45, 9, 20) == (40, 45)
+    assert page_of(30, 20) == 2
+    assert find_certificates(rows, "lion") == [40, 30]
+    assert find_certificates(rows, "  ") == []
@@ -6,7 +6,13 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from LegAid.utils.shared_functions import extract_json_block
+from LegAid.utils.dates import parse_date
+from LegAid.utils.shared_functions import (
+    enforce_first_person,
+    enforce_first_person_many,
+    extract_json_block,
+    normalize_date_strings,
+)
 
 
 def test_extract_json_block_from_code_fence():
@@ -33,3 +39,94 @@ def test_extract_json_block_reports_truncated_content():
         extract_json_block("Result begins { but never ends")
 
     assert "truncated" in str(excinfo.value)
+
+
+def test_enforce_first_person_preserves_case():
+    text = "We are proud. OUR team, our city and ours. Then we've won; WE HAVE, we're here."
+
+    assert enforce_first_person(text) == (
+        "I am proud. MY team, my city and mine. Then I've won; I HAVE, I'm here."
+    )
+    assert enforce_first_person("Owe weary towers") == "Owe weary towers"
+
+
+def test_enforce_first_person_many_matches_single_calls():
+    texts = ["We are here.", "", "our\x00we", "Ours, we", "tower"]
+
+    assert enforce_first_person_many(texts) == [enforce_first_person(t) for t in texts]
+    assert enforce_first_person_many(t for t in texts if "\x00" not in t) == [
+        "I am here.",
+        "",
+        "Mine, I",
+        "tower",
+    ]
+
+
+def test_normalize_date_strings_formats():
+    text = "JUNE 14TH reception, then 6/15/2025, 2025-06-16 and the 17th of June, 2025."
+
+    assert normalize_date_strings(text) == (
+        "June 14, then 2025-06-15, 2025-06-16 and the 2025-06-17."
+    )
+
+
+def test_parse_date_strict_formats_match_fuzzy_parse():
+    from datetime import datetime
+
+    from dateutil import parser as date_parser
+
+    for raw in ("2025-06-14", "6/14/2025", "14-6-2025", "06/07/2024", "02/30/2024"):
+        try:
+            expected = date_parser.parse(raw, fuzzy=True, default=datetime(1900, 1, 1))
+        except ValueError:
+            expected = None
+        assert parse_date(raw) == expected
+
+
+def test_extract_json_block_ignores_quotes_and_braces_in_prose_and_strings():
+    content = 'He said "see {below}" and ]stray[ text: {"text": "a } and \\" {", "n": [1, {"k": "]"}]}'
+
+    assert json.loads(extract_json_block(content)) == {"text": 'a } and " {', "n": [1, {"k": "]"}]}
+
+
+def test_extract_json_block_salvages_inner_block_of_truncated_response():
+    content = '{"certificates": [{"name": "A"}, {"name": "B"'
+
+    assert json.loads(extract_json_block(content)) == {"name": "A"}
+
+
+def test_extract_json_block_skips_stray_quotes_before_payload():
+    content = 'Notes [frame size 8" x 10]\n{"certificates": [{"name": "A"}]}'
+
+    assert json.loads(extract_json_block(content)) == {"certificates": [{"name": "A"}]}
+
+
+def test_extract_json_block_salvages_block_after_unescaped_quote():
+    content = '{"certificates": [{"name": "Ann", "text": "the 6" bronze"}, {"name": "Bo", "title": "x"}]}'
+
+    assert json.loads(extract_json_block(content)) == {"name": "Bo", "title": "x"}
+
+
+# Worst-case inputs for the scanner, which used to be quadratic. Their
+# timings are in benchmarks/bench_json_extract.py.
+def test_extract_json_block_worst_case_unclosed_brackets():
+    assert extract_json_block("{" * 2_000_000 + ' {"ok": 1}') == '{"ok": 1}'
+
+
+def test_extract_json_block_worst_case_deep_nesting():
+    content = "[" * 500_000 + "]" * 500_000 + ' {"ok": 1}'
+
+    assert extract_json_block(content) == '{"ok": 1}'
+
+
+def test_extract_json_block_worst_case_many_invalid_blocks():
+    content = "{not json} [nor, this] " * 100_000 + '{"ok": 1}'
+
+    assert extract_json_block(content) == '{"ok": 1}'
+
+
+def test_extract_json_block_worst_case_large_response():
+    payload = {"certificates": [{"name": f"Recipient {i}", "commendation": "x" * 200} for i in range(20_000)]}
+    content = "Here are the certificates:\n" + json.dumps(payload) + "\nLet me know!"
+
+    assert json.loads(extract_json_block(content)) == payload